@@ -20,6 +20,7 @@ import sqlite3
 import sys
 import time
 from datetime import datetime, timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
@@ -68,9 +69,20 @@ def load_config(config_path: Path) -> dict[str, Any]:
         return toml.load(f)
 
 
+@lru_cache(maxsize=1)
+def _home() -> Path:
+    """Home directory, looked up once per process."""
+    return Path.home()
+
+
+@lru_cache(maxsize=1)
 def resolve_config_path() -> str:
-    """Find config file: user path first, then system path."""
-    user_config = Path.home() / '.config' / 'nomad' / 'nomad.toml'
+    """Find config file: user path first, then system path.
+
+    Cached: cli() and commands such as syscheck both ask for it, and the
+    answer does not change within one invocation.
+    """
+    user_config = Path(_home(), '.config', 'nomad', 'nomad.toml')
     system_config = Path('/etc/nomad/nomad.toml')
     if user_config.exists():
         return str(user_config)
@@ -86,7 +98,7 @@ def get_db_path(config: dict[str, Any]) -> Path:
       1. [database].path — if absolute, use as-is; if relative, join with data_dir
       2. Fall back to data_dir / nomad.db
     """
-    default_data = str(Path.home() / '.local' / 'share' / 'nomad')
+    default_data = str(Path(_home(), '.local', 'share', 'nomad'))
     data_dir = Path(config.get('general', {}).get('data_dir', default_data))
 
     db_path_str = config.get('database', {}).get('path', '')
@@ -1795,6 +1807,66 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
         except Exception:
             pass
 
+    # ── Helper: shared SSH connections (ControlMaster) ───────────────
+    import atexit
+    import hashlib
+    import shutil
+    import tempfile
+
+    ssh_ctl_dir = tempfile.mkdtemp(prefix="nomad-ssh-")
+    ssh_masters = []
+
+    def control_socket(host, ssh_user):
+        # Named by a short hash, not user@host: ssh appends a temporary
+        # suffix while binding, and a long FQDN would overrun sun_path
+        tag = hashlib.blake2b(f"{ssh_user}@{host}".encode(),
+                              digest_size=6).hexdigest()
+        return os.path.join(ssh_ctl_dir, tag)
+
+    def open_control_master(host, ssh_user=None, ssh_key=None):
+        """Open a shared SSH connection to host.
+
+        The socket only appears once authentication succeeds, so this
+        doubles as the connection test. Returns True if connected.
+        """
+        if not ssh_user:
+            ssh_user = os.getenv("USER", "root")
+        sock = control_socket(host, ssh_user)
+        if os.path.exists(sock):
+            return True
+        master_cmd = ["ssh", "-M", "-S", sock,
+                      "-o", "ControlPersist=10m",
+                      "-o", "ConnectTimeout=5",
+                      "-o", "BatchMode=yes",
+                      "-o", "StrictHostKeyChecking=accept-new", "-N"]
+        if ssh_key:
+            master_cmd += ["-i", ssh_key]
+        master_cmd.append(f"{ssh_user}@{host}")
+        try:
+            proc = sp.Popen(master_cmd, stdin=sp.DEVNULL,
+                            stdout=sp.DEVNULL, stderr=sp.DEVNULL)
+        except OSError:
+            return False
+        # Wait for the socket to appear (or ssh to give up)
+        for _ in range(50):
+            if os.path.exists(sock) or proc.poll() is not None:
+                break
+            time.sleep(0.1)
+        connected = os.path.exists(sock) and proc.poll() is None
+        if connected:
+            ssh_masters.append(proc)
+        elif proc.poll() is None:
+            proc.terminate()
+        return connected
+
+    def close_control_masters():
+        for proc in ssh_masters:
+            if proc.poll() is None:
+                proc.terminate()
+        shutil.rmtree(ssh_ctl_dir, ignore_errors=True)
+
+    atexit.register(close_control_masters)
+
     # ── Helper: run a command locally or via SSH ─────────────────────
     def run_cmd(cmd, host=None, ssh_user=None, ssh_key=None):
         """Run a command locally or via SSH. Returns stdout or None."""
@@ -1804,6 +1876,9 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
             ssh_cmd = ["ssh", "-o", "ConnectTimeout=5",
                        "-o", "BatchMode=yes",
                        "-o", "StrictHostKeyChecking=accept-new"]
+            sock = control_socket(host, ssh_user)
+            if os.path.exists(sock):
+                ssh_cmd += ["-S", sock]
             if ssh_key:
                 ssh_cmd += ["-i", ssh_key]
             ssh_cmd += [f"{ssh_user}@{host}", cmd]
@@ -1867,7 +1942,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
         if is_hpc:
             click.echo("  Detecting SLURM partitions... ", nl=False)
             detected = detect_partitions(host, ssh_user, ssh_key)
-            gpu_nodes = detect_gpu_nodes(host, ssh_user, ssh_key)
+            gpu_nodes = set(detect_gpu_nodes(host, ssh_user, ssh_key))
 
             if detected:
                 click.echo(click.style(
@@ -1962,6 +2037,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
 
                 cluster["partitions"][p] = {
                     "nodes": nodes,
+                    "node_count": len(nodes),
                     "gpu_nodes": part_gpu,
                 }
             # Ask for node_ssh_user (e.g., zeus on headnode but root on nodes)
@@ -2019,6 +2095,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                          if n.strip()]
                 cluster["partitions"][dept] = {
                     "nodes": nodes,
+                    "node_count": len(nodes),
                     "gpu_nodes": [],
                 }
                 # Test SSH to first workstation in each group
@@ -2026,9 +2103,8 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                     click.echo(
                         f"  Testing SSH to {nodes[0]}... ",
                         nl=False)
-                    test = run_cmd(
-                        "echo ok", nodes[0], ssh_user, ssh_key)
-                    if test:
+                    if open_control_master(
+                            nodes[0], ssh_user, ssh_key):
                         click.echo(click.style(
                             "✓ Connected", fg="green"))
                     else:
@@ -2157,7 +2233,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                         if pdata.get("gpu_nodes") else "")
             click.echo(
                 f"    {part_label}:    {pid}"
-                f" — {len(pdata['nodes'])} nodes{gpu_info}")
+                f" — {pdata['node_count']} nodes{gpu_info}")
         click.echo(
             f"    Filesystems:  "
             f"{', '.join(cluster.get('filesystems', []))}")
@@ -2172,6 +2248,135 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
             click.echo(f"    Monitoring:   {', '.join(feats)}")
         click.echo()
 
+    def collect_cluster_basics(cluster, is_remote):
+        """Ask for name, type and SSH details, then partitions,
+        filesystems and features. Modifies cluster.
+
+        Values already set on cluster are offered as defaults, so the
+        same sequence serves both a fresh cluster and a redo.
+        Returns (host, ssh_user, ssh_key).
+        """
+        cluster["name"] = click.prompt(
+            "  Cluster name", default=cluster["name"])
+
+        prev_type = cluster.get("type")
+        prev_host = cluster.get("host")
+
+        # Cluster type
+        click.echo()
+        click.echo("  What type of system is this?")
+        click.echo(
+            "    1) HPC cluster (managed by SLURM)")
+        click.echo(
+            "    2) Workstation group"
+            " (department machines, not SLURM)")
+        click.echo()
+        ctype = click.prompt(
+            "  Select",
+            type=click.IntRange(1, 2),
+            default=1 if prev_type in (None, "hpc") else 2)
+        is_hpc = (ctype == 1)
+        cluster["type"] = "hpc" if is_hpc else "workstations"
+        click.echo()
+
+        # SSH details (remote only)
+        ssh_user = None
+        ssh_key = None
+        host = None
+        if is_remote:
+            if is_hpc:
+                # HPC: need a headnode to SSH into
+                click.echo("  SSH connection details:")
+                click.echo(
+                    "  (NØMAD will use SSH to reach"
+                    " this cluster)")
+                click.echo()
+                host = click.prompt(
+                    "  Headnode hostname"
+                    " (e.g., cluster.university.edu)",
+                    default=prev_host)
+            else:
+                # Workstations: no headnode, NØMAD connects
+                # directly to each machine
+                click.echo("  SSH connection details:")
+                click.echo(
+                    "  For workstation groups, NØMAD connects")
+                click.echo(
+                    "  directly to each machine via SSH. Just")
+                click.echo(
+                    "  provide a username and key below — the")
+                click.echo(
+                    "  individual machine hostnames will be set")
+                click.echo(
+                    "  when you list your departments.")
+                click.echo()
+
+            ssh_user = click.prompt(
+                "  SSH username"
+                " (your login on the machines)",
+                default=cluster.get("ssh_user"))
+            default_key = cluster.get("ssh_key")
+            if not default_key:
+                default_key = str(
+                    Path.home() / ".ssh" / "id_ed25519")
+                if not Path(default_key).exists():
+                    default_key = str(
+                        Path.home() / ".ssh" / "id_rsa")
+            ssh_key = click.prompt(
+                "  SSH key path", default=default_key)
+
+            if host:
+                cluster["host"] = host
+            else:
+                cluster.pop("host", None)
+            cluster["ssh_user"] = ssh_user
+            cluster["ssh_key"] = ssh_key
+
+            # Test connection (HPC headnode only;
+            # workstation nodes tested per-department)
+            if host:
+                click.echo()
+                click.echo(
+                    "  Testing SSH connection... ", nl=False)
+                if open_control_master(host, ssh_user, ssh_key):
+                    click.echo(click.style(
+                        "✓ Connected", fg="green"))
+                else:
+                    click.echo(click.style(
+                        "✗ Could not connect", fg="red"))
+                    click.echo()
+                    click.echo("  Check that:")
+                    click.echo(
+                        f"    - {host} is reachable"
+                        f" from this machine")
+                    click.echo(
+                        f"    - SSH key {ssh_key} exists"
+                        f" and is authorized")
+                    click.echo(
+                        f"    - Username '{ssh_user}'"
+                        f" is correct")
+                    click.echo()
+                    click.echo(
+                        "  You can fix these settings in the"
+                        " config file later.")
+            click.echo()
+
+        # Collect partitions, filesystems, features. On a redo that
+        # kept the same type and headnode, offer to skip re-detection.
+        keep_parts = False
+        if (cluster["partitions"]
+                and cluster["type"] == prev_type
+                and cluster.get("host") == prev_host):
+            p_label = "partitions" if is_hpc else "groups"
+            keep_parts = click.confirm(
+                f"  Keep current {p_label}?", default=True)
+        if not keep_parts:
+            collect_partitions(cluster, host, ssh_user, ssh_key)
+        collect_filesystems(cluster, host, ssh_user, ssh_key)
+        collect_features(cluster, host, ssh_user, ssh_key)
+        click.echo()
+        return host, ssh_user, ssh_key
+
     # ── Banner ───────────────────────────────────────────────────────
     click.echo("\033[2J\033[H", nl=False)  # Clear screen
     click.echo()
@@ -2243,6 +2448,10 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                    if (saved and resume) else "")
     dash_port = (saved.get('dash_port', 8050)
                  if (saved and resume) else 8050)
+    # State saved by older versions lacks the cached node counts
+    for c in clusters:
+        for pdata in c.get("partitions", {}).values():
+            pdata.setdefault("node_count", len(pdata["nodes"]))
 
     if quick:
         # ── Quick mode: auto-detect everything ───────────────────────
@@ -2250,7 +2459,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
         click.echo()
         hostname = run_cmd("hostname -s") or "my-cluster"
         partitions = detect_partitions()
-        gpu_nodes = detect_gpu_nodes()
+        gpu_nodes = set(detect_gpu_nodes())
         filesystems = detect_filesystems()
         has_gpu = has_command("nvidia-smi")
         has_nfs = has_command("nfsiostat")
@@ -2273,6 +2482,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
             nodes = detect_nodes_per_partition(p)
             cluster["partitions"][p] = {
                 "nodes": nodes,
+                "node_count": len(nodes),
                 "gpu_nodes": [n for n in nodes if n in gpu_nodes],
             }
         clusters.append(cluster)
@@ -2575,121 +2785,18 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                 f" {'─' * 25}", fg="green"))
             click.echo()
 
-            # Cluster name — always generic default
-            default_name = f"cluster-{i + 1}"
-            name = click.prompt(
-                "  Cluster name", default=default_name)
-
-            # Cluster type
-            click.echo()
-            click.echo("  What type of system is this?")
-            click.echo(
-                "    1) HPC cluster (managed by SLURM)")
-            click.echo(
-                "    2) Workstation group"
-                " (department machines, not SLURM)")
-            click.echo()
-            ctype = click.prompt(
-                "  Select",
-                type=click.IntRange(1, 2), default=1)
-            is_hpc = (ctype == 1)
-            click.echo()
-
             cluster = {
-                "name": name,
+                "name": f"cluster-{i + 1}",
                 "mode": "remote" if is_remote else "local",
-                "type": "hpc" if is_hpc else "workstations",
+                "type": "hpc",
                 "partitions": {},
                 "filesystems": ['/', '/home'],
                 "has_gpu": False,
                 "has_nfs": False,
                 "has_interactive": False,
             }
-
-            # SSH details (remote only)
-            ssh_user = None
-            ssh_key = None
-            host = None
-            if is_remote:
-                if is_hpc:
-                    # HPC: need a headnode to SSH into
-                    click.echo("  SSH connection details:")
-                    click.echo(
-                        "  (NØMAD will use SSH to reach"
-                        " this cluster)")
-                    click.echo()
-                    host = click.prompt(
-                        "  Headnode hostname"
-                        " (e.g., cluster.university.edu)")
-                else:
-                    # Workstations: no headnode, NØMAD connects
-                    # directly to each machine
-                    click.echo("  SSH connection details:")
-                    click.echo(
-                        "  For workstation groups, NØMAD connects")
-                    click.echo(
-                        "  directly to each machine via SSH. Just")
-                    click.echo(
-                        "  provide a username and key below — the")
-                    click.echo(
-                        "  individual machine hostnames will be set")
-                    click.echo(
-                        "  when you list your departments.")
-                    click.echo()
-                    host = None
-
-                ssh_user = click.prompt(
-                    "  SSH username"
-                    " (your login on the machines)")
-                default_key = str(
-                    Path.home() / ".ssh" / "id_ed25519")
-                if not Path(default_key).exists():
-                    default_key = str(
-                        Path.home() / ".ssh" / "id_rsa")
-                ssh_key = click.prompt(
-                    "  SSH key path", default=default_key)
-
-                if host:
-                    cluster["host"] = host
-                cluster["ssh_user"] = ssh_user
-                cluster["ssh_key"] = ssh_key
-
-                # Test connection (HPC headnode only;
-                # workstation nodes tested per-department)
-                if host:
-                    click.echo()
-                    click.echo(
-                        "  Testing SSH connection... ", nl=False)
-                    test = run_cmd(
-                        "echo ok", host, ssh_user, ssh_key)
-                    if test:
-                        click.echo(click.style(
-                            "✓ Connected", fg="green"))
-                    else:
-                        click.echo(click.style(
-                            "✗ Could not connect", fg="red"))
-                        click.echo()
-                        click.echo("  Check that:")
-                        click.echo(
-                            f"    - {host} is reachable"
-                            f" from this machine")
-                        click.echo(
-                            f"    - SSH key {ssh_key} exists"
-                            f" and is authorized")
-                        click.echo(
-                            f"    - Username '{ssh_user}'"
-                            f" is correct")
-                        click.echo()
-                        click.echo(
-                            "  You can fix these settings in the"
-                            " config file later.")
-                click.echo()
-
-            # Collect partitions, filesystems, features
-            collect_partitions(cluster, host, ssh_user, ssh_key)
-            collect_filesystems(cluster, host, ssh_user, ssh_key)
-            collect_features(cluster, host, ssh_user, ssh_key)
-            click.echo()
+            host, ssh_user, ssh_key = collect_cluster_basics(
+                cluster, is_remote)
 
             # ── Confirm / edit / redo loop ───────────────────────────
             while True:
@@ -2716,62 +2823,8 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                         fg="green"))
                     click.echo()
 
-                    name = click.prompt(
-                        "  Cluster name",
-                        default=cluster["name"])
-                    cluster["name"] = name
-
-                    click.echo()
-                    click.echo(
-                        "  What type of system is this?")
-                    click.echo(
-                        "    1) HPC cluster"
-                        " (managed by SLURM)")
-                    click.echo(
-                        "    2) Workstation group"
-                        " (department machines,"
-                        " not SLURM)")
-                    click.echo()
-                    ctype = click.prompt(
-                        "  Select",
-                        type=click.IntRange(1, 2),
-                        default=1)
-                    is_hpc = (ctype == 1)
-                    cluster["type"] = (
-                        "hpc" if is_hpc
-                        else "workstations")
-                    click.echo()
-
-                    if is_remote:
-                        if is_hpc:
-                            host = click.prompt(
-                                "  Headnode hostname",
-                                default=cluster.get(
-                                    "host", ""))
-                            cluster["host"] = host
-                        else:
-                            host = None
-                            cluster.pop("host", None)
-                        ssh_user = click.prompt(
-                            "  SSH username"
-                            " (your login on the machines)",
-                            default=cluster.get(
-                                "ssh_user", ""))
-                        ssh_key = click.prompt(
-                            "  SSH key path",
-                            default=cluster.get(
-                                "ssh_key", ""))
-                        cluster["ssh_user"] = ssh_user
-                        cluster["ssh_key"] = ssh_key
-                        click.echo()
-
-                    collect_partitions(
-                        cluster, host, ssh_user, ssh_key)
-                    collect_filesystems(
-                        cluster, host, ssh_user, ssh_key)
-                    collect_features(
-                        cluster, host, ssh_user, ssh_key)
-                    click.echo()
+                    host, ssh_user, ssh_key = collect_cluster_basics(
+                        cluster, is_remote)
                     continue
 
                 elif choice == 'e':
@@ -2809,7 +2862,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                         for pid, pdata in (
                                 cluster[
                                     "partitions"].items()):
-                            ncount = len(pdata["nodes"])
+                            ncount = pdata["node_count"]
                             click.echo(
                                 f"    • {pid}"
                                 f" ({ncount} nodes)")
@@ -2833,20 +2886,16 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                         _h = cluster.get("host")
                         _u = cluster.get("ssh_user")
                         _k = cluster.get("ssh_key")
-                        gn = detect_gpu_nodes(_h, _u, _k)
+                        gn = set(detect_gpu_nodes(_h, _u, _k))
 
                         new_partitions = {}
                         for p in new_parts:
-                            if p in cluster["partitions"]:
-                                new_partitions[p] = (
-                                    cluster[
-                                        "partitions"][p])
-                                nc = len(
-                                    new_partitions[p][
-                                        'nodes'])
+                            existing = cluster["partitions"].get(p)
+                            if existing is not None:
+                                new_partitions[p] = existing
                                 click.echo(
                                     f"    {p}: keeping"
-                                    f" {nc} nodes")
+                                    f" {existing['node_count']} nodes")
                             else:
                                 if cluster.get("type") == "hpc":
                                     nodes = (
@@ -2888,6 +2937,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                                     pg = []
                                 new_partitions[p] = {
                                     "nodes": nodes,
+                                    "node_count": len(nodes),
                                     "gpu_nodes": pg}
                         cluster["partitions"] = (
                             new_partitions)
@@ -2991,7 +3041,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
 
                     elif (edit_choice == 5
                           and is_remote):
-                        if is_hpc:
+                        if cluster.get("type") == "hpc":
                             cluster["host"] = click.prompt(
                                 "  Headnode hostname",
                                 default=cluster.get(
@@ -3098,10 +3148,8 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
     lines.append("")
 
     # Disk collector
-    all_fs = set()
-    for c in clusters:
-        all_fs.update(c.get("filesystems", []))
-    fs_items = ', '.join(f'"{f}"' for f in sorted(all_fs))
+    all_fs = sorted({f for c in clusters for f in c.get("filesystems", ())})
+    fs_items = ', '.join(f'"{f}"' for f in all_fs)
     lines.append("[collectors.disk]")
     lines.append("enabled = true")
     lines.append(f"filesystems = [{fs_items}]")
@@ -3109,16 +3157,13 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
 
     # SLURM collector (only if HPC clusters exist)
     has_hpc = any(c.get("type", "hpc") == "hpc" for c in clusters)
-    all_parts = set()
-    for c in clusters:
-        if c.get("type", "hpc") == "hpc":
-            all_parts.update(
-                c.get("partitions", {}).keys())
+    all_parts = sorted({p for c in clusters
+                        if c.get("type", "hpc") == "hpc"
+                        for p in c.get("partitions", {})})
     lines.append("[collectors.slurm]")
     lines.append(f"enabled = {str(has_hpc).lower()}")
     if all_parts:
-        parts_items = ', '.join(
-            f'"{p}"' for p in sorted(all_parts))
+        parts_items = ', '.join(f'"{p}"' for p in all_parts)
         lines.append(f"partitions = [{parts_items}]")
     lines.append("")
 
@@ -3248,7 +3293,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                 f'ssh_key = "{cluster["ssh_key"]}"')
 
         total_nodes = sum(
-            len(p["nodes"])
+            p["node_count"]
             for p in cluster["partitions"].values())
         ctype_label = (
             "cluster" if cluster.get("type") == "hpc"
@@ -3269,7 +3314,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
                           else "group")
             lines.append(
                 f'description ='
-                f' "{len(pdata["nodes"])}-node {desc_label}"')
+                f' "{pdata["node_count"]}-node {desc_label}"')
             nodes_items = ', '.join(
                 f'"{n}"' for n in pdata["nodes"])
             lines.append(f'nodes = [{nodes_items}]')
@@ -3612,7 +3657,7 @@ def init(ctx, system, force, quick, no_systemd, no_prolog, dry_run, show):
     for c in clusters:
         pcount = len(c["partitions"])
         ncount = sum(
-            len(p["nodes"])
+            p["node_count"]
             for p in c["partitions"].values())
         if c.get("host"):
             loc = f" → {c['host']}"
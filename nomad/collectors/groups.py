@@ -381,6 +381,27 @@ class GroupCollector(BaseCollector):
             'accounting': all_accounting,
         }]
 
+    @staticmethod
+    def _ensure_submit_ts(c: sqlite3.Cursor) -> bool:
+        """Add the generated submit_ts (epoch seconds) column if missing.
+
+        Generated columns need SQLite 3.31+, and ALTER TABLE can only add
+        VIRTUAL ones; the value is still materialised in its index.
+        Returns False when the column is unavailable.
+        """
+        cols = {r[1] for r in c.execute("PRAGMA table_xinfo(job_accounting)")}
+        if 'submit_ts' in cols:
+            return True
+        if sqlite3.sqlite_version_info < (3, 31, 0):
+            return False
+        c.execute("""
+            ALTER TABLE job_accounting ADD COLUMN submit_ts INTEGER
+            GENERATED ALWAYS AS
+                (CAST(strftime('%s', substr(submit_time, 1, 19)) AS INTEGER))
+            VIRTUAL
+        """)
+        return True
+
     def store(self, data: list[dict[str, Any]]) -> None:
         """Store group membership and accounting data in SQLite."""
         if not data:
@@ -391,6 +412,8 @@ class GroupCollector(BaseCollector):
         accounting = payload.get('accounting', [])
 
         conn = sqlite3.connect(self.db_path)
+        # WAL lets the dashboard keep reading while this writes
+        conn.execute("PRAGMA journal_mode=WAL")
         c = conn.cursor()
 
         # ── Create tables ────────────────────────────────────────────
@@ -404,10 +427,17 @@ class GroupCollector(BaseCollector):
                 PRIMARY KEY (username, group_name, cluster)
             )
         """)
+        # Covers the dashboard's group filter (group_name -> usernames)
         c.execute("""
-            CREATE INDEX IF NOT EXISTS idx_grp_group
-            ON group_membership(group_name)
+            CREATE INDEX IF NOT EXISTS idx_grp_group_user
+            ON group_membership(group_name, username)
         """)
+        # Covers /api/groups, which counts members per (group, cluster)
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_grp_group_cluster
+            ON group_membership(group_name, cluster)
+        """)
+        c.execute("DROP INDEX IF EXISTS idx_grp_group")
         c.execute("""
             CREATE INDEX IF NOT EXISTS idx_grp_user
             ON group_membership(username)
@@ -436,6 +466,10 @@ class GroupCollector(BaseCollector):
             CREATE INDEX IF NOT EXISTS idx_jacct_user
             ON job_accounting(username)
         """)
+        c.execute("""
+            CREATE INDEX IF NOT EXISTS idx_jacct_user_cluster
+            ON job_accounting(username, cluster)
+        """)
         c.execute("""
             CREATE INDEX IF NOT EXISTS idx_jacct_submit
             ON job_accounting(submit_time)
@@ -444,6 +478,22 @@ class GroupCollector(BaseCollector):
             CREATE INDEX IF NOT EXISTS idx_jacct_cluster
             ON job_accounting(cluster)
         """)
+        if self._ensure_submit_ts(c):
+            # Integer range scan for the dashboard's date window; also
+            # covers its windowed per-user sums (index-only scan)
+            c.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jacct_submit_ts
+                ON job_accounting(submit_ts, cluster, username,
+                                  cpu_hours, gpu_hours)
+            """)
+            c.execute("DROP INDEX IF EXISTS idx_jacct_cover")
+        else:
+            # Covers the dashboard's windowed per-user sums (index-only scan)
+            c.execute("""
+                CREATE INDEX IF NOT EXISTS idx_jacct_cover
+                ON job_accounting(submit_time, cluster, username,
+                                  cpu_hours, gpu_hours)
+            """)
 
         # ── Upsert group memberships ─────────────────────────────────
         now = datetime.now().isoformat()
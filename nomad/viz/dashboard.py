@@ -6,6 +6,7 @@ NOMADE Dashboard Server - Integrated Version
 Connects to TOML config, NOMADE database, and falls back to demo data.
 """
 
+import gzip
 import http.server
 import json
 import logging
@@ -4647,6 +4648,11 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
 </body>
 </html>'''
 
+# The page is fixed once the module is loaded, so it is encoded and
+# compressed here instead of on every request
+_DASHBOARD_PAGE = DASHBOARD_HTML.encode()
+_DASHBOARD_PAGE_GZ = gzip.compress(_DASHBOARD_PAGE, compresslevel=6)
+
 
 # ============================================================================
 # HTTP Server
@@ -4750,10 +4756,16 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
         parsed = urlparse(self.path)
 
         if parsed.path == '/' or parsed.path == '/index.html':
+            gz = 'gzip' in self.headers.get('Accept-Encoding', '')
+            body = _DASHBOARD_PAGE_GZ if gz else _DASHBOARD_PAGE
             self.send_response(200)
             self.send_header('Content-Type', 'text/html')
+            if gz:
+                self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Vary', 'Accept-Encoding')
+            self.send_header('Content-Length', str(len(body)))
             self.end_headers()
-            self.wfile.write(DASHBOARD_HTML.encode())
+            self.wfile.write(body)
 
         elif parsed.path == '/api/data':
             self.send_response(200)
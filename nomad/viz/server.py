@@ -6,16 +6,24 @@ NØMAÐ Dashboard Server - Integrated Version
 Connects to TOML config, NØMAÐ database, and falls back to demo data.
 """
 
+import gzip
+import hashlib
 import importlib.metadata
 import http.server
 import urllib.parse
 import json
 import logging
 import math
+import os
+import queue
 import random
 import socketserver
 import sqlite3
-from collections import defaultdict
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from functools import wraps
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
@@ -30,6 +38,13 @@ except ImportError:
     except ImportError:
         tomllib = None
 
+# orjson is optional: it encodes the larger API payloads several times faster
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
 logger = logging.getLogger(__name__)
 
@@ -124,6 +139,106 @@ def get_db_connection(db_path: Path) -> sqlite3.Connection:
     return conn
 
 
+def _open_ro(db_path) -> sqlite3.Connection:
+    """Open a read-only connection tuned for dashboard API queries.
+
+    journal_mode/synchronous are the writers' business (WAL persists in
+    the file once a collector sets it), so only reader-side pragmas are
+    applied here.
+    """
+    uri = Path(db_path).absolute().as_uri() + '?mode=ro'
+    # Pooled connections may be handed to another handler thread
+    conn = sqlite3.connect(uri, uri=True, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA busy_timeout=5000")
+    conn.execute("PRAGMA cache_size=-20000")
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute("PRAGMA mmap_size=268435456")
+    return conn
+
+
+# Idle read-only connections per database, reused across API requests
+_READ_POOLS: dict[str, queue.Queue] = {}
+_READ_POOL_SIZE = os.cpu_count() or 4
+
+
+@contextmanager
+def _checkout(db_path):
+    """Borrow a pooled _open_ro() connection; it is returned, not closed."""
+    pool = _READ_POOLS.setdefault(
+        str(db_path), queue.Queue(maxsize=_READ_POOL_SIZE))
+    try:
+        conn = pool.get_nowait()
+    except queue.Empty:
+        conn = _open_ro(db_path)
+    try:
+        yield conn
+    finally:
+        try:
+            pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+
+def _ttl_lru(maxsize=128, ttl=60):
+    """LRU-cache a function's results for ttl seconds.
+
+    Positional arguments form the key, so callers should pass already
+    normalized values (str paths, int days).
+    """
+    def decorator(fn):
+        entries = OrderedDict()
+        lock = threading.Lock()
+
+        @wraps(fn)
+        def wrapper(*args):
+            now = time.monotonic()
+            with lock:
+                hit = entries.get(args)
+                if hit and hit[0] > now:
+                    entries.move_to_end(args)
+                    return hit[1]
+            value = fn(*args)
+            with lock:
+                entries[args] = (now + ttl, value)
+                entries.move_to_end(args)
+                while len(entries) > maxsize:
+                    entries.popitem(last=False)
+            return value
+
+        wrapper.cache_clear = entries.clear
+        return wrapper
+    return decorator
+
+
+# Smaller JSON bodies aren't worth a gzip header
+_GZIP_MIN_BYTES = 1024
+
+# Fallback encoder, built once; compact like orjson's output
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def _dumps(obj) -> bytes:
+    """Encode an API payload as JSON bytes, with orjson when available."""
+    if HAS_ORJSON:
+        return orjson.dumps(obj)
+    return _JSON_ENCODER.encode(obj).encode()
+
+
+def _etag(body: bytes) -> str:
+    """Weak validator for an encoded JSON body, the same gzipped or not."""
+    return 'W/"' + hashlib.blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _not_modified(headers, etag: str) -> bool:
+    """True when the request's If-None-Match already names etag."""
+    inm = headers.get('If-None-Match')
+    if not inm:
+        return False
+    tags = {t.strip().removeprefix('W/') for t in inm.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
 def row_get(row, key, default=None):
     """Safely get a value from sqlite3.Row (which doesn't have .get())."""
     try:
@@ -2198,6 +2313,10 @@ class DataManager:
         self._ml_predictions = None
         self._discretization = None
         self._clustering_quality = None
+        self._tables = None
+        # The server is threaded: refresh() holds this while it replaces
+        # the data, and readers that need a consistent view take it too
+        self.lock = threading.RLock()
 
         self._load_data()
 
@@ -2370,9 +2489,22 @@ class DataManager:
     def ml_predictions(self):
         return self._ml_predictions
 
+    @property
+    def tables(self):
+        """Table names in the database, probed once until refresh()."""
+        if self._tables is None and self.db_path:
+            try:
+                with _checkout(str(self.db_path)) as conn:
+                    self._tables = _table_names(conn)
+            except sqlite3.Error:
+                return None
+        return self._tables
+
     def refresh(self):
         """Refresh data from source."""
-        self._load_data()
+        with self.lock:
+            self._tables = None
+            self._load_data()
 
 
     def run_ml_predictions(self):
@@ -2857,6 +2989,13 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                         width: 36px;
                         text-align: right;
                     }
+                    .node-grid.windowed {
+                        grid-auto-rows: 144px;
+                        align-content: start;
+                    }
+                    .node-grid.windowed .node-card {
+                        overflow: hidden;
+                    }
 
         
         .node-card {
@@ -3249,15 +3388,16 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                 const [sort, setSort] = useState({by: 'cpu_hours', dir: 'desc'});
                 useEffect(() => {
                     const {cluster, group, days} = filters;
-                    fetch('/api/footprint?cluster=' + cluster + '&group=' + group + '&days=' + days)
-                        .then(r => r.json()).then(setData).catch(() => setData(null));
+                    fetch('/api/dashboard?tab=resources&cluster=' + cluster + '&group=' + group + '&days=' + days)
+                        .then(r => r.json()).then(d => setData(d.footprint)).catch(() => setData(null));
                 }, [filters]);
-                if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading resource data...');
-                const maxCpu = Math.max(...data.groups.map(g => g.cpu_hours), 1);
-                const sorted_users = [...(data.users || [])].sort((a, b) => {
+                // Memoized so re-renders that don't change the data skip the scan and sort
+                const maxCpu = useMemo(() => (data ? data.groups : []).reduce((m, g) => Math.max(m, g.cpu_hours), 1), [data]);
+                const sorted_users = useMemo(() => [...((data && data.users) || [])].sort((a, b) => {
                     if (sort.by === 'username') return sort.dir === 'asc' ? a.username.localeCompare(b.username) : b.username.localeCompare(a.username);
                     return sort.dir === 'desc' ? (b[sort.by] || 0) - (a[sort.by] || 0) : (a[sort.by] || 0) - (b[sort.by] || 0);
-                });
+                }), [data, sort]);
+                if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading resource data...');
                 const doSort = (col) => setSort({by: col, dir: sort.by === col && sort.dir === 'desc' ? 'asc' : 'desc'});
                 const arrow = (col) => sort.by === col ? (sort.dir === 'asc' ? ' ^' : ' v') : '';
                 return React.createElement('div', {style: eduStyles.panel},
@@ -3340,16 +3480,21 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                 const [filters, setFilters] = useState({cluster: 'all', group: 'all', days: '30'});
                 useEffect(() => {
                     const {cluster, group, days} = filters;
-                    fetch('/api/heatmap?cluster=' + cluster + '&group=' + group + '&days=' + days)
-                        .then(r => r.json()).then(setData).catch(() => setData(null));
+                    fetch('/api/dashboard?tab=activity&cluster=' + cluster + '&group=' + group + '&days=' + days)
+                        .then(r => r.json()).then(d => setData(d.heatmap)).catch(() => setData(null));
                 }, [filters]);
+                // 256 shades cover the gradient's 180-step green channel, so
+                // cells index a table instead of formatting a color each render
+                const colorTable = useMemo(() => Array.from({length: 256}, (_, k) => {
+                    const i = k / 255;
+                    return 'rgb(' + Math.round(20 + i * 20) + ',' + Math.round(40 + i * 180) + ',' + Math.round(20 + i * 60) + ')';
+                }), []);
+                // The API sends the 7x24 grid flat; split it into day rows once per fetch
+                const rows = useMemo(() => data ? Array.from({length: 7}, (_, di) => data.grid.slice(di * 24, di * 24 + 24)) : [], [data]);
                 if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading activity data...');
                 const dayNames = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
-                const getColor = (v) => {
-                    if (!v) return 'rgba(255,255,255,0.03)';
-                    const i = Math.min(v / (data.max_value || 1), 1);
-                    return 'rgb(' + Math.round(20 + i * 20) + ',' + Math.round(40 + i * 180) + ',' + Math.round(20 + i * 60) + ')';
-                };
+                const scale = 255 / (data.max_value || 1);
+                const getColor = (v) => v ? colorTable[Math.min(Math.round(v * scale), 255)] : 'rgba(255,255,255,0.03)';
                 return React.createElement('div', {style: eduStyles.panel},
                     React.createElement('div', {style: eduStyles.filterBar},
                         React.createElement('select', {value: filters.cluster, onChange: e => setFilters({...filters, cluster: e.target.value}), style: eduStyles.select},
@@ -3387,7 +3532,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                             React.createElement('div', {style: eduStyles.hmLabelCell}),
                             Array.from({length: 24}, (_, i) => React.createElement('div', {key: i, style: eduStyles.hmHourLabel}, i % 3 === 0 ? i + 'h' : ''))
                         ),
-                        data.grid.map((row, di) => React.createElement('div', {key: di, style: eduStyles.hmRow},
+                        rows.map((row, di) => React.createElement('div', {key: di, style: eduStyles.hmRow},
                             React.createElement('div', {style: eduStyles.hmDayLabel}, dayNames[di]),
                             row.map((v, hi) => React.createElement('div', {
                                 key: hi,
@@ -3401,7 +3546,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                         React.createElement('div', {style: eduStyles.legendBar},
                             [0, 0.2, 0.4, 0.6, 0.8, 1.0].map(i => React.createElement('div', {
                                 key: i,
-                                style: {width: '16px', height: '12px', backgroundColor: 'rgb(' + Math.round(20+i*20) + ',' + Math.round(40+i*180) + ',' + Math.round(20+i*60) + ')'}
+                                style: {width: '16px', height: '12px', backgroundColor: colorTable[Math.round(i * 255)]}
                             }))
                         ),
                         React.createElement('span', {style: eduStyles.legendLabel}, 'More')
@@ -5092,6 +5237,13 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                 return () => clearInterval(timer);
             }, []);
             
+            // The clock re-renders App every second; keep the node list for
+            // ClusterView the same array until the data or the tab changes
+            const clusterNodes = useMemo(
+                () => nodes ? Object.values(nodes).filter(n => n.cluster === activeTab) : [],
+                [nodes, activeTab]
+            );
+            
             if (!clusters || !nodes || !jobs || !edges || !activeTab) {
                 return (
                     <div style={{
@@ -5268,7 +5420,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                                 <ClusterView
                                     cluster={clusters[activeTab]}
                                     clusterName={activeTab}
-                                    nodes={Object.values(nodes).filter(n => n.cluster === activeTab)}
+                                    nodes={clusterNodes}
                                     selectedNode={selectedNode}
                                     onSelectNode={setSelectedNode}
                                     queueRunning={queueRunning}
@@ -5281,13 +5433,249 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
             );
         }
         
+        const GPU_BADGE_STYLE = { background: "#1a1a1a", color: "#ffffff" };
+        const CPU_BADGE_STYLE = { background: "rgba(255,255,255,0.9)", color: "#1a1a1a" };
+        
+        // Health band for a success rate, used by the cards, ClusterView
+        // and NodeSidebar
+        const nodeHealthColor = (rate) => {
+            if (rate >= 0.85) return 'green';
+            if (rate >= 0.60) return 'yellow';
+            return 'red';
+        };
+        
+        // A card re-renders only when its node or its selection changes, so
+        // clicking a node touches two cards rather than the whole grid
+        const NodeCard = React.memo(function NodeCard({ node, isSelected, onSelectNode }) {
+            return (
+                <div
+                    className={`node-card ${node.status === 'down' ? 'down' : ''} ${isSelected ? 'selected' : ''}`}
+                    onClick={() => onSelectNode(node.name)}
+                >
+                    <div className="node-name">{node.name}</div>
+                    <div className={`node-indicator ${node.status === 'down' ? 'offline' : nodeHealthColor(node.success_rate || 0)}`}>
+                        {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
+                    </div>
+                    <div className="node-jobs">
+                        {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : (node.jobs_running > 0 ? `${node.jobs_running} running` : `${node.jobs_today || 0} jobs`)}
+                    </div>
+                    <div className="node-gpu-badge" style={node.has_gpu ? GPU_BADGE_STYLE : CPU_BADGE_STYLE}>{node.has_gpu ? "GPU" : "CPU"}</div>
+                </div>
+            );
+        }, (a, b) => a.node === b.node && a.isSelected === b.isSelected);
+        
+        // Partitions with more nodes than this render only the rows in view
+        const NODE_GRID_WINDOW_MIN = 200;
+        // Must match .node-grid (minmax(100px, 1fr), 12px gap) and the
+        // 144px grid-auto-rows of .node-grid.windowed
+        const NODE_CARD_MIN_WIDTH = 100;
+        const NODE_GRID_GAP = 12;
+        const NODE_ROW_HEIGHT = 144 + NODE_GRID_GAP;
+        
+        function NodeGrid({ nodes, renderCard }) {
+            const ref = useRef(null);
+            const [view, setView] = useState(null);
+            const windowed = nodes.length > NODE_GRID_WINDOW_MIN;
+            
+            React.useLayoutEffect(() => {
+                if (!windowed) return;
+                let frame = 0;
+                const measure = () => {
+                    frame = 0;
+                    const rect = ref.current.getBoundingClientRect();
+                    const cols = Math.max(1, Math.floor((rect.width + NODE_GRID_GAP) / (NODE_CARD_MIN_WIDTH + NODE_GRID_GAP)));
+                    // Rows in view plus one viewport of overscan on each side
+                    const span = Math.ceil(window.innerHeight / NODE_ROW_HEIGHT);
+                    const first = Math.max(0, Math.floor(-rect.top / NODE_ROW_HEIGHT) - span);
+                    const last = Math.max(first, Math.ceil((window.innerHeight - rect.top) / NODE_ROW_HEIGHT) + span);
+                    setView(v => v && v.cols === cols && v.first === first && v.last === last ? v : { cols, first, last });
+                };
+                const schedule = () => { if (!frame) frame = requestAnimationFrame(measure); };
+                measure();
+                // Capture, so scrolling inside any container is seen too
+                window.addEventListener('scroll', schedule, true);
+                window.addEventListener('resize', schedule);
+                return () => {
+                    cancelAnimationFrame(frame);
+                    window.removeEventListener('scroll', schedule, true);
+                    window.removeEventListener('resize', schedule);
+                };
+            }, [windowed]);
+            
+            if (!windowed) {
+                return <div className="node-grid">{nodes.map(renderCard)}</div>;
+            }
+            const { cols, first, last } = view || { cols: 1, first: 0, last: 0 };
+            const rows = Math.ceil(nodes.length / cols);
+            return (
+                <div
+                    ref={ref}
+                    className="node-grid windowed"
+                    style={{ paddingTop: first * NODE_ROW_HEIGHT, height: rows * NODE_ROW_HEIGHT - NODE_GRID_GAP }}
+                >
+                    {nodes.slice(first * cols, last * cols).map(renderCard)}
+                </div>
+            );
+        }
+        
+        // Every partition's nodes and totals, gathered in one pass over the
+        // nodes; a node can belong to more than one partition
+        function summarizePartitions(nodes, partitions) {
+            const sums = Object.keys(partitions).map(name => ({
+                name, nodes: [], online: 0, cpu: 0, mem: 0, gpu: 0, gpuOnline: 0,
+                hasGpu: false, running: 0, jobs: 0, ok: 0,
+            }));
+            const byNode = new Map();
+            for (const s of sums) {
+                for (const nm of partitions[s.name] || []) {
+                    const into = byNode.get(nm);
+                    if (!into) byNode.set(nm, [s]);
+                    else if (into[into.length - 1] !== s) into.push(s);
+                }
+            }
+            for (const n of nodes) {
+                const into = byNode.get(n.name);
+                if (!into) continue;
+                const up = n.status === 'online';
+                for (const s of into) {
+                    s.nodes.push(n);
+                    if (n.has_gpu) s.hasGpu = true;
+                    if (up) {
+                        s.online++;
+                        s.cpu += n.cpu_util || 0;
+                        s.mem += n.mem_util || 0;
+                        if (n.has_gpu) {
+                            s.gpu += n.gpu_util || 0;
+                            s.gpuOnline++;
+                        }
+                    }
+                    s.running += n.jobs_running || 0;
+                    s.jobs += n.jobs_today || 0;
+                    s.ok += n.jobs_success || 0;
+                }
+            }
+            return sums.filter(s => s.nodes.length > 0).map(s => ({
+                partName: s.name,
+                partNodes: s.nodes,
+                online: s.online,
+                down: s.nodes.length - s.online,
+                hasGpu: s.hasGpu,
+                avgCpu: s.online > 0 ? Math.round(s.cpu / s.online) : 0,
+                avgMem: s.online > 0 ? Math.round(s.mem / s.online) : 0,
+                avgGpu: s.gpuOnline > 0 ? Math.round(s.gpu / s.gpuOnline) : 0,
+                totalRunning: s.running,
+                totalJobs: s.jobs,
+                okJobs: s.ok,
+                failJobs: s.jobs - s.ok,
+            }));
+        }
+        
+        // Bar widths move in 2% steps, so a poll that nudges an average by a
+        // point or so leaves the width, and its CSS transition, alone
+        const utilBucket = (pct) => Math.round(pct / 2) * 2;
+        
+        // Memoized: re-renders only when a rounded average changes
+        const PartitionBars = React.memo(function PartitionBars({ cpu, mem, gpu, hasGpu }) {
+            return (
+                <div className="partition-bars">
+                    <div className="util-bar">
+                        <span className="util-label">CPU</span>
+                        <div className="util-track">
+                            <div className="util-fill cpu" style={{width: utilBucket(cpu) + '%'}}></div>
+                        </div>
+                        <span className="util-value">{cpu}%</span>
+                    </div>
+                    <div className="util-bar">
+                        <span className="util-label">Memory</span>
+                        <div className="util-track">
+                            <div className="util-fill mem" style={{width: utilBucket(mem) + '%'}}></div>
+                        </div>
+                        <span className="util-value">{mem}%</span>
+                    </div>
+                    {hasGpu && (
+                        <div className="util-bar">
+                            <span className="util-label">GPU</span>
+                            <div className="util-track">
+                                <div className="util-fill gpu" style={{width: utilBucket(gpu) + '%'}}></div>
+                            </div>
+                            <span className="util-value">{gpu}%</span>
+                        </div>
+                    )}
+                </div>
+            );
+        });
+        
+        // Partition descriptions by name, worked out once per name rather
+        // than on every render
+        const PART_TYPE_CACHE = new Map();
+        const classifyPartition = (name, hasGpu) => {
+            if (hasGpu) return 'GPU-accelerated partition';
+            let type = PART_TYPE_CACHE.get(name);
+            if (type === undefined) {
+                const lc = name.toLowerCase();
+                type = lc.includes('highmem') ? 'High-memory partition'
+                    : lc.includes('debug') ? 'Debug partition'
+                    : lc.includes('short') ? 'Short jobs partition'
+                    : 'General CPU partition';
+                PART_TYPE_CACHE.set(name, type);
+            }
+            return type;
+        };
+        
+        function PartitionSections({ partitions, nodes, selectedNode, onSelectNode }) {
+            const summaries = useMemo(
+                () => summarizePartitions(nodes, partitions || {}),
+                [nodes, partitions]
+            );
+            // Shared by the flat grid and every partition's grid
+            const renderNodeCard = node => (
+                <NodeCard key={node.name} node={node} isSelected={selectedNode === node.name} onSelectNode={onSelectNode} />
+            );
+            
+            // If no partition info, render flat grid
+            if (!partitions || Object.keys(partitions).length === 0) {
+                return <NodeGrid nodes={nodes} renderCard={renderNodeCard} />;
+            }
+            
+            // Render partition sections
+            return summaries.map(({ partName, partNodes, online, down, hasGpu, avgCpu, avgMem, avgGpu, totalRunning, totalJobs, okJobs, failJobs }) => {
+                // Partition type description
+                const partType = classifyPartition(partName, hasGpu);
+                
+                return (
+                    <div key={partName} className="partition-section">
+                        <div className="partition-header">
+                            <div className="partition-title">
+                                <span className="partition-name">{partName}</span>
+                                <span className="partition-type">{partType}</span>
+                                <span className="partition-count">
+                                    {online}/{partNodes.length} nodes
+                                    {down > 0 && <span className="partition-down"> ({down} down)</span>}
+                                </span>
+                            </div>
+                            <div className="partition-stats">
+                                <span className="partition-jobs">
+                                    {totalRunning > 0 ? <><span style={{color: '#3b82f6'}}>{totalRunning} running</span>{'  '}</> : ''}{okJobs > 0 ? <><span style={{color: '#22c55e'}}>{okJobs} succeeded</span>{'  '}</> : ''}{failJobs > 0 ? <span style={{color: '#ef4444'}}>{failJobs} fail</span> : ''}{totalRunning === 0 && okJobs === 0 && failJobs === 0 ? '0 jobs' : ''}
+                                </span>
+                            </div>
+                            <PartitionBars cpu={avgCpu} mem={avgMem} gpu={avgGpu} hasGpu={hasGpu} />
+                        </div>
+                        <NodeGrid nodes={partNodes} renderCard={renderNodeCard} />
+                    </div>
+                );
+            });
+        }
+        
         function ClusterView({ cluster, clusterName, nodes, selectedNode, onSelectNode, queueRunning }) {
             const stats = useMemo(() => {
-                const online = nodes.filter(n => n.status === 'online');
+                // One loop counts the online nodes and sums their jobs
                 // Deduplicate nodes (same node appears in multiple partitions)
                 const seen = new Set();
+                let online = 0;
                 let runningJobs = 0, pendingJobs = 0, successJobs = 0, failedJobs = 0;
-                online.forEach(n => {
+                for (const n of nodes) {
+                    if (n.status !== 'online') continue;
+                    online++;
                     if (!seen.has(n.name)) {
                         seen.add(n.name);
                         runningJobs += (n.jobs_running || 0);
@@ -5295,7 +5683,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                         successJobs += (n.jobs_success || 0);
                         failedJobs += (n.jobs_failed || 0);
                     }
-                });
+                }
                 // Override with queue_state data if available (more accurate)
                 const qr = queueRunning[clusterName] || queueRunning[cluster?.name];
                 if (qr) {
@@ -5307,8 +5695,8 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                     ? successJobs / totalCompleted
                     : (runningJobs > 0 ? 1.0 : 0);
                 return {
-                    online: online.length,
-                    down: nodes.length - online.length,
+                    online,
+                    down: nodes.length - online,
                     runningJobs,
                     pendingJobs,
                     successJobs,
@@ -5317,12 +5705,6 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                 };
             }, [nodes]);
             
-            const getHealthColor = (rate) => {
-                if (rate >= 0.85) return 'green';
-                if (rate >= 0.60) return 'yellow';
-                return 'red';
-            };
-            
             // Workstation cluster: show workstation cards instead of SLURM view
             if (cluster.type === 'workstation' || nodes.length === 0) {
                 const [wsData, setWsData] = useState(null);
@@ -5545,140 +5927,19 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                             <div className="stat-label">Failed</div>
                         </div>
                         <div className="stat">
-                            <div className={`stat-value ${getHealthColor(stats.avgSuccess)}`}>
+                            <div className={`stat-value ${nodeHealthColor(stats.avgSuccess)}`}>
                                 {(stats.avgSuccess * 100).toFixed(1)}%
                             </div>
                             <div className="stat-label">Avg Success</div>
                         </div>
                     </div>
                     
-                    {(() => {
-                        // Group nodes by partition
-                        const partitions = cluster.partitions || {};
-                        const partitionNames = Object.keys(partitions);
-                        
-                        // If no partition info, render flat grid
-                        if (partitionNames.length === 0) {
-                            return (
-                                <div className="node-grid">
-                                    {nodes.map(node => (
-                                        <div
-                                            key={node.name}
-                                            className={`node-card ${node.status === 'down' ? 'down' : ''} ${selectedNode === node.name ? 'selected' : ''}`}
-                                            onClick={() => onSelectNode(node.name)}
-                                        >
-                                            <div className="node-name">{node.name}</div>
-                                            <div className={`node-indicator ${node.status === 'down' ? 'offline' : getHealthColor(node.success_rate || 0)}`}>
-                                                {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
-                                            </div>
-                                            <div className="node-jobs">
-                                                {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : (node.jobs_running > 0 ? `${node.jobs_running} running` : `${node.jobs_today || 0} jobs`)}
-                                            </div>
-                                            <div className="node-gpu-badge" style={{ background: node.has_gpu ? "#1a1a1a" : "rgba(255,255,255,0.9)", color: node.has_gpu ? "#ffffff" : "#1a1a1a" }}>{node.has_gpu ? "GPU" : "CPU"}</div>
-                                        </div>
-                                    ))}
-                                </div>
-                            );
-                        }
-                        
-                        // Render partition sections
-                        return partitionNames.map(partName => {
-                            const partNodeNames = partitions[partName] || [];
-                            const partNodes = nodes.filter(n => partNodeNames.includes(n.name));
-                            if (partNodes.length === 0) return null;
-                            
-                            const online = partNodes.filter(n => n.status === 'online');
-                            const down = partNodes.length - online.length;
-                            const hasGpu = partNodes.some(n => n.has_gpu);
-                            
-                            // Calculate utilization
-                            const avgCpu = online.length > 0 
-                                ? Math.round(online.reduce((s, n) => s + (n.cpu_util || 0), 0) / online.length)
-                                : 0;
-                            const avgMem = online.length > 0
-                                ? Math.round(online.reduce((s, n) => s + (n.mem_util || 0), 0) / online.length)
-                                : 0;
-                            const avgGpu = hasGpu && online.length > 0
-                                ? Math.round(online.filter(n => n.has_gpu).reduce((s, n) => s + (n.gpu_util || 0), 0) / online.filter(n => n.has_gpu).length)
-                                : 0;
-                            
-                            // Job stats for this partition
-                            const totalRunning = partNodes.reduce((s, n) => s + (n.jobs_running || 0), 0);
-                            const totalJobs = partNodes.reduce((s, n) => s + (n.jobs_today || 0), 0);
-                            const okJobs = partNodes.reduce((s, n) => s + (n.jobs_success || 0), 0);
-                            const failJobs = totalJobs - okJobs;
-                            
-                            // Partition type description
-                            const partType = hasGpu ? 'GPU-accelerated partition' 
-                                : partName.toLowerCase().includes('highmem') ? 'High-memory partition'
-                                : partName.toLowerCase().includes('debug') ? 'Debug partition'
-                                : partName.toLowerCase().includes('short') ? 'Short jobs partition'
-                                : 'General CPU partition';
-                            
-                            return (
-                                <div key={partName} className="partition-section">
-                                    <div className="partition-header">
-                                        <div className="partition-title">
-                                            <span className="partition-name">{partName}</span>
-                                            <span className="partition-type">{partType}</span>
-                                            <span className="partition-count">
-                                                {online.length}/{partNodes.length} nodes
-                                                {down > 0 && <span className="partition-down"> ({down} down)</span>}
-                                            </span>
-                                        </div>
-                                        <div className="partition-stats">
-                                            <span className="partition-jobs">
-                                                {totalRunning > 0 ? <><span style={{color: '#3b82f6'}}>{totalRunning} running</span>{'  '}</> : ''}{okJobs > 0 ? <><span style={{color: '#22c55e'}}>{okJobs} succeeded</span>{'  '}</> : ''}{failJobs > 0 ? <span style={{color: '#ef4444'}}>{failJobs} fail</span> : ''}{totalRunning === 0 && okJobs === 0 && failJobs === 0 ? '0 jobs' : ''}
-                                            </span>
-                                        </div>
-                                        <div className="partition-bars">
-                                            <div className="util-bar">
-                                                <span className="util-label">CPU</span>
-                                                <div className="util-track">
-                                                    <div className="util-fill cpu" style={{width: avgCpu + '%'}}></div>
-                                                </div>
-                                                <span className="util-value">{avgCpu}%</span>
-                                            </div>
-                                            <div className="util-bar">
-                                                <span className="util-label">Memory</span>
-                                                <div className="util-track">
-                                                    <div className="util-fill mem" style={{width: avgMem + '%'}}></div>
-                                                </div>
-                                                <span className="util-value">{avgMem}%</span>
-                                            </div>
-                                            {hasGpu && (
-                                                <div className="util-bar">
-                                                    <span className="util-label">GPU</span>
-                                                    <div className="util-track">
-                                                        <div className="util-fill gpu" style={{width: avgGpu + '%'}}></div>
-                                                    </div>
-                                                    <span className="util-value">{avgGpu}%</span>
-                                                </div>
-                                            )}
-                                        </div>
-                                    </div>
-                                    <div className="node-grid">
-                                        {partNodes.map(node => (
-                                            <div
-                                                key={node.name}
-                                                className={`node-card ${node.status === 'down' ? 'down' : ''} ${selectedNode === node.name ? 'selected' : ''}`}
-                                                onClick={() => onSelectNode(node.name)}
-                                            >
-                                                <div className="node-name">{node.name}</div>
-                                                <div className={`node-indicator ${node.status === 'down' ? 'offline' : getHealthColor(node.success_rate || 0)}`}>
-                                                    {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
-                                                </div>
-                                                <div className="node-jobs">
-                                                    {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : (node.jobs_running > 0 ? `${node.jobs_running} running` : `${node.jobs_today || 0} jobs`)}
-                                                </div>
-                                                <div className="node-gpu-badge" style={{ background: node.has_gpu ? "#1a1a1a" : "rgba(255,255,255,0.9)", color: node.has_gpu ? "#ffffff" : "#1a1a1a" }}>{node.has_gpu ? "GPU" : "CPU"}</div>
-                                            </div>
-                                        ))}
-                                    </div>
-                                </div>
-                            );
-                        });
-                    })()}
+                    <PartitionSections
+                        partitions={cluster.partitions}
+                        nodes={nodes}
+                        selectedNode={selectedNode}
+                        onSelectNode={onSelectNode}
+                    />
                 </div>
             );
         }
@@ -5695,12 +5956,6 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                 );
             }
             
-            const getHealthColor = (rate) => {
-                if (rate >= 0.85) return 'green';
-                if (rate >= 0.60) return 'yellow';
-                return 'red';
-            };
-            
             return (
                 <aside className="sidebar">
                     <div className="node-detail-header">
@@ -5747,7 +6002,7 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
                                 </div>
                                 <div className="detail-row">
                                     <span className="detail-label">Success Rate</span>
-                                    <span className={`detail-value ${getHealthColor(node.success_rate || 0)}`}>
+                                    <span className={`detail-value ${nodeHealthColor(node.success_rate || 0)}`}>
                                         {((node.success_rate || 0) * 100).toFixed(1)}%
                                     </span>
                                 </div>
@@ -7264,6 +7519,11 @@ DASHBOARD_HTML = '''<!DOCTYPE html>
 </body>
 </html>'''
 
+# The page is fixed once the module is loaded, so it is encoded and
+# compressed here instead of on every request
+_DASHBOARD_PAGE = DASHBOARD_HTML.encode()
+_DASHBOARD_PAGE_GZ = gzip.compress(_DASHBOARD_PAGE, compresslevel=6)
+
 EXIT_CODE_NAMES = {
     0: 'SUCCESS', 1: 'FAILED', 2: 'TIMEOUT', 3: 'OOM',
     4: 'SEGFAULT', 5: 'NODE_FAIL', 6: 'CANCELLED', 7: 'UNKNOWN'
@@ -7562,6 +7822,12 @@ def generate_mobile_html(dm, stats):
 
 
 
+def _table_names(conn):
+    """Names of the tables in the database behind conn."""
+    return frozenset(r[0] for r in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type='table'"))
+
+
 def _filter_umbrella_groups(conn, groups):
     """Exclude groups that contain >80% of all users."""
     try:
@@ -7583,22 +7849,171 @@ def _filter_umbrella_groups(conn, groups):
     return groups
 
 
-def query_resource_footprint(db_path, cluster='all', group='all', days=30):
-    """Query resource footprint from job_accounting + group_membership."""
-    import sqlite3 as _sql
-    from datetime import datetime as _dt
-    from datetime import timedelta as _td
-    start = (_dt.now() - _td(days=int(days))).strftime('%Y-%m-%dT00:00:00')
-    conn = _sql.connect(str(db_path))
-    conn.row_factory = _sql.Row
-    c = conn.cursor()
-    tables = [r[0] for r in c.execute(
-        "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
-    empty = {
+# ── job_accounting statements ───────────────────────────────────────
+# One fixed SQL text per (by_epoch, by_cluster, by_group) combination,
+# built once at import so SQLite's statement cache can reuse the compiled
+# plan. by_epoch windows on the collector's indexed submit_ts column
+# instead of comparing submit_time strings. Parameters are always
+# (start[, cluster][, group]); see _job_filter().
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _job_where(by_epoch, by_cluster, by_group):
+    where = ["submit_ts >= ?" if by_epoch else "submit_time >= ?"]
+    if by_cluster:
+        where.append("cluster = ?")
+    if by_group:
+        # Semi-join: a user listed for several clusters still counts once
+        where.append(
+            "username IN (SELECT username FROM group_membership"
+            " WHERE group_name = ?)")
+    return " AND ".join(where)
+
+
+_FILTER_VARIANTS = [(be, bc, bg) for be in (False, True)
+                    for bc in (False, True) for bg in (False, True)]
+
+
+
+def _submit_part(fmt, by_epoch):
+    """SQL for strftime(fmt) of a job's submit time, as an integer."""
+    arg = ("submit_ts, 'unixepoch'" if by_epoch
+           else "substr(submit_time, 1, 19)")
+    return f"CAST(strftime('{fmt}', {arg}) AS INTEGER)"
+
+
+_SQL_FP_PER_USER = {v: """
+        SELECT username, cluster,
+               ROUND(COALESCE(SUM(cpu_hours), 0), 1) as cpu_hours,
+               ROUND(COALESCE(SUM(gpu_hours), 0), 1) as gpu_hours,
+               COUNT(*) as jobs
+        FROM job_accounting
+        WHERE """ + _job_where(*v) + """
+        GROUP BY username, cluster""" for v in _FILTER_VARIANTS}
+
+_SQL_FP_TOP_USERS = {v: sql + """
+        ORDER BY cpu_hours DESC, username, cluster
+        LIMIT 100""" for v, sql in _SQL_FP_PER_USER.items()}
+
+_SQL_FP_TOTALS = {v: """
+        SELECT ROUND(COALESCE(SUM(cpu_hours), 0), 1) as cpu_hours,
+               ROUND(COALESCE(SUM(gpu_hours), 0), 1) as gpu_hours,
+               COALESCE(SUM(jobs), 0) as jobs,
+               COUNT(DISTINCT username) as users
+        FROM (""" + sql + """)""" for v, sql in _SQL_FP_PER_USER.items()}
+
+# A group filter keeps every group of the matching users. Membership is
+# per cluster, so each (user, group) pair is counted once
+_SQL_FP_GROUPS = {v: """
+        SELECT gm.group_name as name,
+               ROUND(SUM(ja.cpu_hours), 1) as cpu_hours,
+               ROUND(SUM(ja.gpu_hours), 1) as gpu_hours,
+               SUM(ja.jobs) as jobs,
+               COUNT(DISTINCT ja.username) as users
+        FROM (""" + sql + """) ja
+        JOIN (SELECT DISTINCT username, group_name
+              FROM group_membership) gm ON gm.username = ja.username
+        GROUP BY gm.group_name
+        ORDER BY cpu_hours DESC""" for v, sql in _SQL_FP_PER_USER.items()}
+
+# Bucketed in SQLite; at most 7x24 rows come back. %w is 0=Sunday.
+_SQL_HEATMAP = {v: """
+        SELECT """ + _submit_part('%w', v[0]) + """ as dow,
+               """ + _submit_part('%H', v[0]) + """ as hr,
+               COUNT(*) as jobs
+        FROM job_accounting
+        WHERE submit_time IS NOT NULL AND """ + _job_where(*v) + """
+        GROUP BY dow, hr""" for v in _FILTER_VARIANTS}
+
+
+def _job_filter(start, by_epoch, cluster, group):
+    """Statement variant key and parameters for a window and filters.
+
+    ``start`` is the naive local start of the window. SQLite reads the
+    submit_time strings as UTC, so the epoch bound is taken the same way.
+    """
+    params = [(start - _EPOCH) // _SECOND if by_epoch
+              else start.strftime('%Y-%m-%dT%H:%M:%S')]
+    if cluster != 'all':
+        params.append(cluster)
+    if group != 'all':
+        params.append(group)
+    return (by_epoch, cluster != 'all', group != 'all'), params
+
+
+@_ttl_lru(maxsize=4, ttl=300)
+def _has_submit_ts(db_path):
+    """True if the collector has added job_accounting.submit_ts."""
+    with _checkout(db_path) as conn:
+        # table_info() hides generated columns; table_xinfo() lists them
+        return any(r[1] == 'submit_ts' for r in conn.execute(
+            "PRAGMA table_xinfo(job_accounting)"))
+
+
+@_ttl_lru(maxsize=4, ttl=300)
+def _available_filters(db_path):
+    """(clusters, groups) offered by the footprint/heatmap filter selects.
+
+    Both lists change only when collectors see a new cluster or group,
+    so they are cached rather than re-queried on every API request.
+    """
+    with _checkout(db_path) as conn:
+        tables = _table_names(conn)
+        clusters = []
+        if 'job_accounting' in tables:
+            clusters = [r[0] for r in conn.execute(
+                "SELECT DISTINCT cluster FROM job_accounting ORDER BY cluster")]
+        groups = []
+        if 'group_membership' in tables:
+            groups = _filter_umbrella_groups(conn, [r[0] for r in conn.execute(
+                "SELECT DISTINCT group_name FROM group_membership"
+                " ORDER BY group_name")])
+    return clusters, groups
+
+
+def _has_job_tables(tables):
+    """False only if ``tables`` is known and has nothing to aggregate."""
+    return tables is None or not tables.isdisjoint({'job_accounting', 'jobs'})
+
+
+def _empty_footprint():
+    """Footprint payload for a missing or empty database."""
+    return {
         'groups': [], 'users': [],
         'totals': {'cpu_hours': 0, 'gpu_hours': 0, 'jobs': 0, 'users': 0},
         'filters': {'clusters': [], 'groups': []},
     }
+
+
+def query_resource_footprint(db_path, cluster='all', group='all', days=30,
+                             tables=None):
+    """Query resource footprint from job_accounting + group_membership.
+
+    ``tables`` is the set of table names in the database, when the caller
+    already knows it (see DataManager.tables); otherwise it is probed.
+    """
+    if db_path is None or not _has_job_tables(tables):
+        return _empty_footprint()
+    try:
+        with _checkout(db_path) as conn:
+            return _resource_footprint(
+                conn, db_path, cluster, group, days, tables)
+    except sqlite3.Error:
+        return _empty_footprint()
+
+
+def _resource_footprint(conn, db_path, cluster, group, days, tables=None):
+    """query_resource_footprint() on an open connection."""
+    from datetime import datetime as _dt
+    from datetime import timedelta as _td
+    since = (_dt.now() - _td(days=int(days))).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    start = since.strftime('%Y-%m-%dT00:00:00')
+    c = conn.cursor()
+    if tables is None:
+        tables = _table_names(conn)
     if 'job_accounting' not in tables or (
             'job_accounting' in tables and
             c.execute('SELECT COUNT(*) FROM job_accounting'
@@ -7612,6 +8027,15 @@ def query_resource_footprint(db_path, cluster='all', group='all', days=30):
                     where_j.append(
                         "source_site = ?")
                     params_j.append(cluster)
+                grp_map = {}
+                if 'group_membership' in tables:
+                    c.execute(
+                        'SELECT username, group_name'
+                        ' FROM group_membership')
+                    for row in c:
+                        grp_map.setdefault(
+                            row['username'], []
+                        ).append(row['group_name'])
                 c.execute("""
                     SELECT user_name as username,
                         COALESCE(source_site, 'unknown')
@@ -7629,18 +8053,8 @@ def query_resource_footprint(db_path, cluster='all', group='all', days=30):
                     WHERE """ + ' AND '.join(where_j)
                     + ' GROUP BY username, cluster',
                     params_j)
-                user_rows = c.fetchall()
-                grp_map = {}
-                if 'group_membership' in tables:
-                    c.execute(
-                        'SELECT username, group_name'
-                        ' FROM group_membership')
-                    for row in c.fetchall():
-                        grp_map.setdefault(
-                            row['username'], []
-                        ).append(row['group_name'])
                 users = []
-                for row in user_rows:
+                for row in c:
                     u = row['username']
                     ugroups = grp_map.get(u, [])
                     if group != 'all' and \
@@ -7713,7 +8127,6 @@ def query_resource_footprint(db_path, cluster='all', group='all', days=30):
                     for g in u['groups']))
                 all_groups = _filter_umbrella_groups(
                     conn, all_groups)
-                conn.close()
                 return {
                     'groups': groups_list,
                     'users': sorted(
@@ -7740,94 +8153,114 @@ def query_resource_footprint(db_path, cluster='all', group='all', days=30):
                 }
             except Exception:
                 pass
-        conn.close()
-        return empty
-    where = ["submit_time >= ?"]
-    params = [start]
-    if cluster != 'all':
-        where.append("cluster = ?")
-        params.append(cluster)
-    c.execute("""
-        SELECT username, cluster,
-               SUM(cpu_hours) as cpu_hours,
-               SUM(gpu_hours) as gpu_hours,
-               COUNT(*) as jobs
-        FROM job_accounting
-        WHERE """ + " AND ".join(where) + """
-        GROUP BY username, cluster
-    """, params)
+        return _empty_footprint()
+    variant, params = _job_filter(
+        since, _has_submit_ts(str(db_path)), cluster,
+        group if 'group_membership' in tables else 'all')
+    # Only the top 100 rows leave SQLite; totals come from their own query
+    c.execute(_SQL_FP_TOP_USERS[variant], params)
     user_rows = c.fetchall()
+    c.execute(_SQL_FP_TOTALS[variant], params)
+    totals = dict(c.fetchone())
+    # Memberships of the listed users only, not of everyone in the table
     grp_map = {}
-    if 'group_membership' in tables:
-        c.execute("SELECT username, group_name FROM group_membership")
-        for row in c.fetchall():
+    top = list({row['username'] for row in user_rows} - {None})
+    if 'group_membership' in tables and top:
+        c.execute(
+            "SELECT username, group_name FROM group_membership"
+            " WHERE username IN (" + ",".join("?" * len(top)) + ")", top)
+        for row in c:
             grp_map.setdefault(row['username'], []).append(row['group_name'])
+    # Hours arrive rounded from the per-user subquery
     users = []
-    user_set = set()
     for row in user_rows:
-        u = row['username']
-        user_set.add(u)
-        ugroups = grp_map.get(u, [])
-        if group != 'all' and group not in ugroups:
-            continue
-        users.append({
-            'username': u, 'cluster': row['cluster'],
-            'cpu_hours': round(row['cpu_hours'] or 0, 1),
-            'gpu_hours': round(row['gpu_hours'] or 0, 1),
-            'jobs': row['jobs'], 'groups': ugroups,
-        })
-    gtotals = {}
-    for u in users:
-        for g in u['groups']:
-            if g not in gtotals:
-                gtotals[g] = {'name': g, 'cpu_hours': 0,
-                              'gpu_hours': 0, 'jobs': 0, 'users': set()}
-            gtotals[g]['cpu_hours'] += u['cpu_hours']
-            gtotals[g]['gpu_hours'] += u['gpu_hours']
-            gtotals[g]['jobs'] += u['jobs']
-            gtotals[g]['users'].add(u['username'])
-    glist = sorted(gtotals.values(), key=lambda x: x['cpu_hours'], reverse=True)
-    for g in glist:
-        g['users'] = len(g['users'])
-    try:
-        c.execute("SELECT DISTINCT source_site FROM jobs WHERE source_site IS NOT NULL")
-        avail_clusters = [r[0] for r in c.fetchall()]
-    except Exception:
-        c.execute("SELECT DISTINCT cluster FROM job_accounting")
-        avail_clusters = [r[0] for r in c.fetchall()]
-    avail_groups = _filter_umbrella_groups(conn, sorted(gtotals.keys()))
-    umbrella_set = set(sorted(gtotals.keys())) - set(avail_groups)
-    glist = [g for g in glist if g["name"] not in umbrella_set]
-    conn.close()
+        user = dict(row)
+        user['groups'] = grp_map.get(row['username'], [])
+        users.append(user)
+    # Per-group totals: let SQLite join the per-user sums to memberships.
+    # A group filter keeps every group of the matching users, as before.
+    glist = []
+    if 'group_membership' in tables:
+        c.execute(_SQL_FP_GROUPS[variant], params)
+        glist = [dict(r) for r in c]
+    avail_clusters, avail_groups = _available_filters(str(db_path))
+    # Every known non-umbrella group is in avail_groups
+    shown = set(avail_groups)
+    glist = [g for g in glist if g["name"] in shown]
     return {
         'groups': glist[:50],
-        'users': sorted(users, key=lambda x: x['cpu_hours'], reverse=True)[:100],
-        'totals': {
-            'cpu_hours': round(sum(u['cpu_hours'] for u in users), 1),
-            'gpu_hours': round(sum(u['gpu_hours'] for u in users), 1),
-            'jobs': sum(u['jobs'] for u in users),
-            'users': len(user_set),
-        },
+        'users': users,
+        'totals': totals,
         'filters': {'clusters': avail_clusters, 'groups': avail_groups},
     }
 
 
-def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
+@_ttl_lru(maxsize=128, ttl=60)
+def _footprint_json(db_path, cluster, group, days, tables):
+    """Encoded /api/footprint body; group data only changes per collector run."""
+    return _dumps(query_resource_footprint(
+        db_path, cluster, group, days, tables))
+
+
+def _start_part(fmt):
+    """SQL for strftime(fmt) of a jobs.start_time, as an integer.
+
+    Only text that starts with an ISO date and hour counts, so numbers
+    aren't read as Julian days.
+    """
+    return (f"CASE WHEN start_time GLOB '[0-9][0-9][0-9][0-9]-[0-9][0-9]-"
+            f"[0-9][0-9]?[0-9][0-9]*' THEN CAST(strftime('{fmt}', "
+            f"substr(start_time, 1, 10) || ' ' || substr(start_time, 12, 2)"
+            f" || ':00:00') AS INTEGER) END")
+
+
+_DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+              'Friday', 'Saturday', 'Sunday']
+
+
+def _peak_cells(counts):
+    """Grid cells with the most and the fewest jobs.
+
+    ``counts`` maps non-empty cells to job counts, so the quietest hour is
+    the quietest one that saw any jobs. Ties go to the earliest cell.
+    """
+    busiest = min(counts, key=lambda cell: (-counts[cell], cell))
+    quietest = min(counts, key=lambda cell: (counts[cell], cell))
+    return busiest, quietest
+
+
+def _empty_heatmap():
+    """Heatmap payload for a missing or empty database."""
+    return {
+        'grid': [0] * 168, 'max_value': 0,
+        'total_jobs': 0, 'busiest': None, 'quietest': None,
+        'filters': {'clusters': [], 'groups': []},
+    }
+
+
+def query_activity_heatmap(db_path, cluster='all', group='all', days=30,
+                           tables=None):
     """Query activity heatmap from job_accounting submit times."""
-    import sqlite3 as _sql
+    if db_path is None or not _has_job_tables(tables):
+        return _empty_heatmap()
+    try:
+        with _checkout(db_path) as conn:
+            return _activity_heatmap(
+                conn, db_path, cluster, group, days, tables)
+    except sqlite3.Error:
+        return _empty_heatmap()
+
+
+def _activity_heatmap(conn, db_path, cluster, group, days, tables=None):
+    """query_activity_heatmap() on an open connection."""
     from datetime import datetime as _dt
     from datetime import timedelta as _td
-    start = (_dt.now() - _td(days=int(days))).strftime('%Y-%m-%dT00:00:00')
-    conn = _sql.connect(str(db_path))
-    conn.row_factory = _sql.Row
+    since = (_dt.now() - _td(days=int(days))).replace(
+        hour=0, minute=0, second=0, microsecond=0)
+    start = since.strftime('%Y-%m-%dT00:00:00')
     c = conn.cursor()
-    tables = [r[0] for r in c.execute(
-        "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
-    empty = {
-        'grid': [[0]*24 for _ in range(7)], 'max_value': 0,
-        'total_jobs': 0, 'busiest': None, 'quietest': None,
-        'filters': {'clusters': [], 'groups': []},
-    }
+    if tables is None:
+        tables = _table_names(conn)
     has_accounting = (
         'job_accounting' in tables and
         c.execute('SELECT COUNT(*) FROM job_accounting'
@@ -7843,62 +8276,42 @@ def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
                 if cluster != 'all':
                     where_j.append('source_site = ?')
                     params_j.append(cluster)
+                if group != 'all' and \
+                        'group_membership' in tables:
+                    where_j.append(
+                        'user_name IN (SELECT username'
+                        ' FROM group_membership'
+                        ' WHERE group_name = ?)')
+                    params_j.append(group)
+                # Bucketed by SQLite, like _SQL_HEATMAP; start times it
+                # cannot parse come back NULL and are dropped
                 c.execute(
-                    'SELECT start_time, user_name'
+                    'SELECT ' + _start_part('%w') + ' as dow,'
+                    ' ' + _start_part('%H') + ' as hr,'
+                    ' COUNT(*) as jobs'
                     ' FROM jobs WHERE '
-                    + ' AND '.join(where_j),
+                    + ' AND '.join(where_j)
+                    + ' GROUP BY dow, hr'
+                    ' HAVING dow IS NOT NULL AND hr IS NOT NULL',
                     params_j)
-                grid = [[0]*24 for _ in range(7)]
-                total = 0
-                gu2 = None
-                if group != 'all' and \
-                        'group_membership' in tables:
-                    c2 = conn.cursor()
-                    c2.execute(
-                        'SELECT username FROM'
-                        ' group_membership WHERE'
-                        ' group_name = ?', (group,))
-                    gu2 = set(
-                        r[0] for r in c2.fetchall())
-                for row in c.fetchall():
-                    if gu2 and row['user_name'] \
-                            not in gu2:
-                        continue
-                    try:
-                        dt = _dt.strptime(
-                            row['start_time'][:19],
-                            '%Y-%m-%dT%H:%M:%S')
-                        grid[dt.weekday()][
-                            dt.hour] += 1
-                        total += 1
-                    except (ValueError, TypeError):
-                        continue
-                max_val = max(
-                    max(row) for row in grid) \
-                    if total else 0
+                grid = [0] * 168
+                for row in c:
+                    grid[(row['dow'] + 6) % 7 * 24 + row['hr']] = \
+                        row['jobs']
+                total = sum(grid)
+                max_val = max(grid) if total else 0
                 busiest = quietest = None
                 if total:
-                    days = ['Monday','Tuesday',
-                        'Wednesday','Thursday',
-                        'Friday','Saturday',
-                        'Sunday']
-                    best = (0, 0, 0)
-                    worst = (0, 0, 999999)
-                    for d in range(7):
-                        for h in range(24):
-                            v = grid[d][h]
-                            if v > best[2]:
-                                best = (d, h, v)
-                            if v < worst[2]:
-                                worst = (d, h, v)
+                    counts = {i: v for i, v in enumerate(grid) if v}
+                    best, worst = _peak_cells(counts)
                     busiest = {
-                        'day': days[best[0]],
-                        'hour': f'{best[1]}:00',
-                        'count': best[2]}
+                        'day': _DAY_NAMES[best // 24],
+                        'hour': f'{best % 24}:00',
+                        'count': counts[best]}
                     quietest = {
-                        'day': days[worst[0]],
-                        'hour': f'{worst[1]}:00',
-                        'count': worst[2]}
+                        'day': _DAY_NAMES[worst // 24],
+                        'hour': f'{worst % 24}:00',
+                        'count': counts[worst]}
                 all_clusters = []
                 try:
                     all_clusters = sorted(set(
@@ -7921,7 +8334,6 @@ def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
                             ).fetchall())))
                 except Exception:
                     pass
-                conn.close()
                 return {
                     'grid': grid,
                     'max_value': max_val,
@@ -7935,58 +8347,32 @@ def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
                 }
             except Exception:
                 pass
-        conn.close()
-        return empty
-    group_users = None
-    if group != 'all' and 'group_membership' in tables:
-        c.execute(
-            "SELECT username FROM group_membership WHERE group_name = ?",
-            (group,))
-        group_users = set(r[0] for r in c.fetchall())
-    where = ["submit_time >= ?", "submit_time IS NOT NULL"]
-    params = [start]
-    if cluster != 'all':
-        where.append("cluster = ?")
-        params.append(cluster)
-    c.execute("""
-        SELECT submit_time, username
-        FROM job_accounting WHERE """ + " AND ".join(where) + """
-    """, params)
-    grid = [[0]*24 for _ in range(7)]
-    total = 0
-    for row in c.fetchall():
-        if group_users is not None and row['username'] not in group_users:
-            continue
-        try:
-            dt = _dt.strptime(row['submit_time'][:19], '%Y-%m-%dT%H:%M:%S')
-            grid[dt.weekday()][dt.hour] += 1
-            total += 1
-        except (ValueError, TypeError):
-            continue
-    max_val = 0
+        return _empty_heatmap()
+    variant, params = _job_filter(
+        since, _has_submit_ts(str(db_path)), cluster,
+        group if 'group_membership' in tables else 'all')
+    c.execute(_SQL_HEATMAP[variant], params)
+    # Flat Monday-first day x hour grid: cell (day, hour) is day * 24 + hour.
+    # The GROUP BY only returns non-empty cells.
+    counts = {}
+    for row in c:
+        if row['dow'] is None:
+            continue  # unparseable submit_time
+        counts[(row['dow'] + 6) % 7 * 24 + row['hr']] = row['jobs']
+    grid = [0] * 168
+    for cell, jobs in counts.items():
+        grid[cell] = jobs
+    total = sum(counts.values())
     busiest = {'day': 'Monday', 'hour': 0, 'count': 0}
-    quietest = {'day': 'Monday', 'hour': 0, 'count': 999999}
-    dnames = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
-              'Friday', 'Saturday', 'Sunday']
-    for di in range(7):
-        for hi in range(24):
-            v = grid[di][hi]
-            if v > max_val:
-                max_val = v
-                busiest = {'day': dnames[di], 'hour': hi, 'count': v}
-            if v < quietest['count']:
-                quietest = {'day': dnames[di], 'hour': hi, 'count': v}
-    if quietest['count'] == 999999:
-        quietest['count'] = 0
-    c.execute("SELECT DISTINCT cluster FROM job_accounting")
-    avail_clusters = [r[0] for r in c.fetchall()]
-    avail_groups = []
-    if 'group_membership' in tables:
-        c.execute(
-            "SELECT DISTINCT group_name FROM group_membership ORDER BY group_name")
-        avail_groups = _filter_umbrella_groups(
-            conn, [r[0] for r in c.fetchall()])
-    conn.close()
+    quietest = dict(busiest)
+    if counts:
+        best, worst = _peak_cells(counts)
+        busiest = {'day': _DAY_NAMES[best // 24], 'hour': best % 24,
+                   'count': counts[best]}
+        quietest = {'day': _DAY_NAMES[worst // 24], 'hour': worst % 24,
+                    'count': counts[worst]}
+    max_val = busiest['count']
+    avail_clusters, avail_groups = _available_filters(str(db_path))
     return {
         'grid': grid, 'max_value': max_val, 'total_jobs': total,
         'busiest': busiest, 'quietest': quietest,
@@ -7994,6 +8380,67 @@ def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
     }
 
 
+@_ttl_lru(maxsize=128, ttl=60)
+def _heatmap_json(db_path, cluster, group, days, tables):
+    """Encoded /api/heatmap body, cached like _footprint_json()."""
+    return _dumps(query_activity_heatmap(
+        db_path, cluster, group, days, tables))
+
+
+def query_dashboard(db_path, tab='all', cluster='all', group='all', days=30,
+                    tables=None):
+    """Footprint and/or heatmap for one request, sharing a connection.
+
+    ``tab`` is 'resources' (footprint only), 'activity' (heatmap only)
+    or 'all'; anything else is treated as 'all'. Both aggregations then
+    read the same warm page cache.
+    """
+    want = {'footprint': tab != 'activity',
+            'heatmap': tab != 'resources'}
+    result = {}
+    try:
+        if db_path is None or not _has_job_tables(tables):
+            raise sqlite3.Error('no job tables')
+        with _checkout(db_path) as conn:
+            if want['footprint']:
+                result['footprint'] = _resource_footprint(
+                    conn, db_path, cluster, group, days, tables)
+            if want['heatmap']:
+                result['heatmap'] = _activity_heatmap(
+                    conn, db_path, cluster, group, days, tables)
+        clusters, groups = _available_filters(str(db_path))
+    except sqlite3.Error:
+        result = {}
+        if want['footprint']:
+            result['footprint'] = _empty_footprint()
+        if want['heatmap']:
+            result['heatmap'] = _empty_heatmap()
+        clusters, groups = [], []
+    result['filters'] = {'clusters': clusters, 'groups': groups}
+    return result
+
+
+@_ttl_lru(maxsize=128, ttl=60)
+def _dashboard_json(db_path, tab, cluster, group, days, tables):
+    """Encoded /api/dashboard body, cached like _footprint_json()."""
+    return _dumps(query_dashboard(
+        db_path, tab, cluster, group, days, tables))
+
+
+def _params(query):
+    """(cluster, group, days, tab) from an analytics API query string.
+
+    A missing or bad days means 30.
+    """
+    qs = parse_qs(query)
+    try:
+        days = int(qs.get('days', [30])[0])
+    except ValueError:
+        days = 30
+    return (qs.get('cluster', ['all'])[0], qs.get('group', ['all'])[0],
+            days, qs.get('tab', ['all'])[0])
+
+
 def _get_cloud_data(db_path) -> dict:
     """Query cloud_metrics table for dashboard display."""
     empty = {"instances": [], "latest": [], "timeseries": [], "cost": [], "summary": {}}
@@ -8063,15 +8510,70 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
     """Custom handler for the dashboard."""
 
     data_manager: DataManager = None
+    # HTTP/1.1 so the panels' parallel API fetches can reuse connections;
+    # idle keep-alive sockets are dropped after `timeout` seconds
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+    _keep_alive = False
+
+    def _send_json(self, body: bytes, etag: Optional[str] = None):
+        """Send an encoded JSON body with an explicit Content-Length.
+
+        The body is gzipped when the client accepts it, and the connection
+        is kept open for the next request. With an etag the client is told
+        to revalidate, and a request that already holds this body gets an
+        empty 304 instead.
+        """
+        if etag is not None and _not_modified(self.headers, etag):
+            self.send_response(304)
+            self.send_header('ETag', etag)
+            self.send_header('Vary', 'Accept-Encoding')
+            self._keep_alive = True
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Access-Control-Allow-Origin', '*')
+        if etag is not None:
+            self.send_header('ETag', etag)
+            self.send_header('Cache-Control', 'no-cache')
+        if (len(body) >= _GZIP_MIN_BYTES
+                and 'gzip' in self.headers.get('Accept-Encoding', '')):
+            body = gzip.compress(body, compresslevel=1)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self._keep_alive = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_page(self):
+        """Send the dashboard page, pre-gzipped when the client accepts it."""
+        gz = 'gzip' in self.headers.get('Accept-Encoding', '')
+        body = _DASHBOARD_PAGE_GZ if gz else _DASHBOARD_PAGE
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        if gz:
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Vary', 'Accept-Encoding')
+        self.send_header('Content-Length', str(len(body)))
+        self._keep_alive = True
+        self.end_headers()
+        self.wfile.write(body)
+
+    def end_headers(self):
+        # Only _send_json() and _send_page() frame their bodies; every other
+        # response is delimited by closing the connection, as under HTTP/1.0
+        if not self._keep_alive and not self.close_connection:
+            self.send_header('Connection', 'close')
+        self._keep_alive = False
+        super().end_headers()
 
     def do_GET(self):
         parsed = urlparse(self.path)
 
         if parsed.path == '/' or parsed.path == '/index.html':
-            self.send_response(200)
-            self.send_header('Content-Type', 'text/html')
-            self.end_headers()
-            self.wfile.write(DASHBOARD_HTML.encode())
+            self._send_page()
 
         elif parsed.path == '/api/data':
             self.send_response(200)
@@ -8080,22 +8582,23 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             self.end_headers()
 
             dm = DashboardHandler.data_manager
-            data = {
-                "clusters": dm.clusters,
-                "nodes": dm.nodes,
-                "jobs": dm.jobs,
-                "edges": dm.edges,
-                "data_source": dm.data_source,
-                "nomad_version": importlib.metadata.version("nomad-hpc"),
-                "feature_stats": dm.feature_stats,
-                "correlation_data": dm.correlation_data,
-                "suggested_axes": dm.suggested_axes,
-                "network_stats": dm.network_stats,
-                "clustering_quality": dm.clustering_quality,
-                "network_method": dm.network_stats.get("method", "cosine") if dm.network_stats else "cosine",
-                "ml_predictions": dm.ml_predictions or {"status": "not_ready"},
-                "queue_running": dm.get_queue_running(),
-            }
+            with dm.lock:
+                data = {
+                    "clusters": dm.clusters,
+                    "nodes": dm.nodes,
+                    "jobs": dm.jobs,
+                    "edges": dm.edges,
+                    "data_source": dm.data_source,
+                    "nomad_version": importlib.metadata.version("nomad-hpc"),
+                    "feature_stats": dm.feature_stats,
+                    "correlation_data": dm.correlation_data,
+                    "suggested_axes": dm.suggested_axes,
+                    "network_stats": dm.network_stats,
+                    "clustering_quality": dm.clustering_quality,
+                    "network_method": dm.network_stats.get("method", "cosine") if dm.network_stats else "cosine",
+                    "ml_predictions": dm.ml_predictions or {"status": "not_ready"},
+                    "queue_running": dm.get_queue_running(),
+                }
             # Detect which features have data
             features = {}
             if dm.db_path:
@@ -8145,7 +8648,9 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
                 if dm.db_path:
                     from nomad.ml import load_predictions_from_db, train_and_save_ensemble
                     result = train_and_save_ensemble(str(dm.db_path), epochs=50, verbose=False)
-                    dm._ml_predictions = load_predictions_from_db(str(dm.db_path))
+                    predictions = load_predictions_from_db(str(dm.db_path))
+                    with dm.lock:
+                        dm._ml_predictions = predictions
                     self.wfile.write(json.dumps({"status": "trained", "prediction_id": result.get("prediction_id")}).encode())
                 else:
                     self.wfile.write(json.dumps({"status": "error", "message": "No database"}).encode())
@@ -8153,6 +8658,11 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
                 self.wfile.write(json.dumps({"status": "error", "message": str(e)}).encode())
         elif parsed.path == '/api/refresh':
             DashboardHandler.data_manager.refresh()
+            _footprint_json.cache_clear()
+            _heatmap_json.cache_clear()
+            _dashboard_json.cache_clear()
+            _available_filters.cache_clear()
+            _has_submit_ts.cache_clear()
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
@@ -8162,7 +8672,8 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
             self.end_headers()
-            stats = DashboardHandler.data_manager.get_stats()
+            with DashboardHandler.data_manager.lock:
+                stats = DashboardHandler.data_manager.get_stats()
             stats["queue_running"] = (
                 DashboardHandler.data_manager
                 .get_queue_running())
@@ -8176,53 +8687,42 @@ class DashboardHandler(http.server.SimpleHTTPRequestHandler):
             mobile_html = generate_mobile_html(dm, stats)
             self.wfile.write(mobile_html.encode())
         elif parsed.path.startswith('/api/footprint'):
-            query = parse_qs(parsed.query)
-            fp_cluster = query.get('cluster', ['all'])[0]
-            fp_group = query.get('group', ['all'])[0]
-            fp_days = int(query.get('days', [30])[0])
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            fp_cluster, fp_group, fp_days, _ = _params(parsed.query)
             dm = DashboardHandler.data_manager
-            result = query_resource_footprint(
-                dm.db_path, fp_cluster, fp_group, fp_days)
-            self.wfile.write(json.dumps(result).encode())
+            body = _footprint_json(
+                str(dm.db_path) if dm.db_path else None,
+                fp_cluster, fp_group, fp_days, dm.tables)
+            self._send_json(body, _etag(body))
         elif parsed.path.startswith('/api/heatmap'):
-            query = parse_qs(parsed.query)
-            hm_cluster = query.get('cluster', ['all'])[0]
-            hm_group = query.get('group', ['all'])[0]
-            hm_days = int(query.get('days', [30])[0])
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            hm_cluster, hm_group, hm_days, _ = _params(parsed.query)
             dm = DashboardHandler.data_manager
-            result = query_activity_heatmap(
-                dm.db_path, hm_cluster, hm_group, hm_days)
-            self.wfile.write(json.dumps(result).encode())
+            body = _heatmap_json(
+                str(dm.db_path) if dm.db_path else None,
+                hm_cluster, hm_group, hm_days, dm.tables)
+            self._send_json(body, _etag(body))
+        elif parsed.path.startswith('/api/dashboard'):
+            # Everything a tab needs in one round trip
+            db_cluster, db_group, db_days, db_tab = _params(parsed.query)
+            dm = DashboardHandler.data_manager
+            body = _dashboard_json(
+                str(dm.db_path) if dm.db_path else None,
+                db_tab, db_cluster, db_group, db_days, dm.tables)
+            self._send_json(body, _etag(body))
         elif parsed.path == '/api/groups':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
             dm = DashboardHandler.data_manager
             try:
-                import sqlite3 as _sql
-                conn = _sql.connect(str(dm.db_path))
-                conn.row_factory = _sql.Row
-                c = conn.cursor()
-                c.execute("""
-                    SELECT group_name, cluster, COUNT(*) as members
-                    FROM group_membership
-                    GROUP BY group_name, cluster
-                    ORDER BY group_name
-                """)
-                groups = [dict(r) for r in c.fetchall()]
-                conn.close()
+                with _checkout(dm.db_path) as conn:
+                    c = conn.cursor()
+                    c.execute("""
+                        SELECT group_name, cluster, COUNT(*) as members
+                        FROM group_membership
+                        GROUP BY group_name, cluster
+                        ORDER BY group_name, cluster
+                    """)
+                    groups = [dict(r) for r in c.fetchall()]
             except Exception:
                 groups = []
-            self.wfile.write(json.dumps({'groups': groups}).encode())
+            self._send_json(_dumps({'groups': groups}))
         elif parsed.path == '/api/interactive':
             self.send_response(200)
             self.send_header('Content-Type', 'application/json')
@@ -9043,8 +9543,12 @@ def serve_dashboard(host='localhost', port=8050, config_path=None, db_path=None)
     print()
 
     # Allow port reuse
-    class ReusableTCPServer(socketserver.TCPServer):
+    # Threaded, so one browser's idle keep-alive connection can't stall
+    # the others
+    class ReusableTCPServer(socketserver.ThreadingMixIn,
+                            socketserver.TCPServer):
         allow_reuse_address = True
+        daemon_threads = True
     with ReusableTCPServer((host, port), DashboardHandler) as httpd:
         httpd.serve_forever()
 
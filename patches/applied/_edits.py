@@ -0,0 +1,79 @@
+"""Table-driven insertions shared by the feature patch scripts.
+
+A script describes each change to a file as an ``Edit`` and hands the
+list to ``apply_edits()``, which locates every marker in one scan of the
+mapped file and writes the result once.
+"""
+from dataclasses import dataclass
+
+from _fileio import mapped, preserve, splice, spit
+from _fingerprint import already_patched_file, record_file
+from _patterns import alternation, scan
+
+
+@dataclass(frozen=True)
+class Edit:
+    """One insertion into a file.
+
+    ``done`` names markers whose presence means the edit is already in
+    place. ``anchors`` is tried in order; each entry is (marker, where,
+    text) with where one of 'before', 'after' or 'replace'. ``missing``
+    is printed when no anchor is found.
+    """
+    done: tuple
+    anchors: tuple
+    missing: str = None
+
+
+def apply_edits(script, path, label, markers, edits, backup=False):
+    """Apply edits to path, locating markers (a {name: bytes} table).
+
+    Returns False only when path does not exist. With backup the
+    original is kept next to it as ``.py.bak`` before it is rewritten.
+    The file is fingerprinted only when every pending edit found an
+    anchor, so a partial patch is retried on the next run.
+    """
+    if not path.exists():
+        print(f"  ! {path} not found")
+        return False
+
+    if already_patched_file(script, path):
+        print(f"  = {label} (already patched)")
+        return True
+
+    queued = []
+    missed = 0
+    with mapped(path) as content:
+        positions = scan(alternation(markers), content)
+        for edit in edits:
+            if any(name in positions for name in edit.done):
+                continue
+            for name, where, text in edit.anchors:
+                if name in positions:
+                    start = positions[name][0]
+                    end = start + len(markers[name])
+                    if where == 'before':
+                        queued.append((start, start, text))
+                    elif where == 'after':
+                        queued.append((end, end, text))
+                    else:
+                        queued.append((start, end, text))
+                    break
+            else:
+                missed += 1
+                if edit.missing:
+                    print(edit.missing)
+        patched = splice(content, queued)
+
+    if queued:
+        if backup:
+            preserve(path, path.with_suffix('.py.bak'))
+        spit(path, patched)
+        if not missed:
+            record_file(script, path)
+        print(f"  + {label} ({len(queued)} edits)")
+    elif missed:
+        print(f"  ! {label} not patched")
+    else:
+        print(f"  = {label} (already patched)")
+    return True
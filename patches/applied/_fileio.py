@@ -0,0 +1,172 @@
+"""File read/write helpers shared by the patch scripts.
+
+Plain ``os`` calls on raw file descriptors: no TextIOWrapper, no
+buffering layer. ``slurp``/``spit`` do one read and one write for the
+whole file (``spit`` renames a temp file into place, which lets
+``preserve`` hardlink backups instead of copying);
+``chunks``/``stream_subn`` keep only a window in memory for large
+generated files; ``mapped`` exposes a file as a read-only mmap;
+``splice`` applies queued edits in one pass.
+(Not named ``_io`` — that is the stdlib's C io module.)
+"""
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+CHUNK = 65536
+
+
+def slurp(path) -> bytes:
+    """Return the full contents of path as bytes."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        size = os.fstat(fd).st_size
+        data = os.read(fd, size)
+        # Short reads are legal; finish off if one happens
+        while len(data) < size:
+            chunk = os.read(fd, size - len(data))
+            if not chunk:
+                break
+            data += chunk
+        return data
+    finally:
+        os.close(fd)
+
+
+def spit(path, data: bytes) -> None:
+    """Replace the contents of path with data, atomically.
+
+    data is written and fsync'd to a temp file next to path, which is
+    then renamed over it: a crash leaves the old file or the new one,
+    never half of each. path keeps its mode; a symlink is followed.
+    """
+    target = os.path.realpath(path)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(target),
+                               prefix='.' + os.path.basename(target))
+    try:
+        try:
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        try:
+            shutil.copymode(target, tmp)
+        except FileNotFoundError:
+            os.chmod(tmp, 0o644)
+        os.replace(tmp, target)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def preserve(path, dest) -> None:
+    """Keep the current contents of path at dest.
+
+    dest becomes a hardlink to path, so nothing is copied. That is safe
+    only because spit() and stream_subn() swap a new file in rather than
+    writing into the old one: call this right before one of them, once
+    it is certain the file will change, or the "backup" stays the live
+    file. Across filesystems, or where links are not supported, dest is
+    a plain copy.
+    """
+    try:
+        os.unlink(dest)
+    except FileNotFoundError:
+        pass
+    try:
+        os.link(path, dest)
+    except OSError:
+        shutil.copy(path, dest)
+
+
+def chunks(path, size: int = CHUNK):
+    """Yield the contents of path in blocks of at most size bytes."""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        while True:
+            block = os.read(fd, size)
+            if not block:
+                return
+            yield block
+    finally:
+        os.close(fd)
+
+
+def stream_subn(path, pattern, repl: bytes, overlap: int, count: int = 1) -> int:
+    """Replace up to count matches of pattern in path, one chunk at a time.
+
+    overlap must be at least the longest possible match: that many bytes
+    are held back between chunks so a match split across a boundary is
+    still found. Output goes to a temp file in the same directory, which
+    replaces path only if something matched. Returns the match count.
+    """
+    n = 0
+    tmp = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(os.path.abspath(path)), delete=False)
+    try:
+        with tmp:
+            buf = b''
+            for block in chunks(path):
+                buf += block
+                while n < count:
+                    m = pattern.search(buf)
+                    if m is None:
+                        break
+                    tmp.write(buf[:m.start()])
+                    tmp.write(repl)
+                    buf = buf[m.end():]
+                    n += 1
+                # Hold back a tail that may start a match, unless we're done
+                cut = max(len(buf) - overlap, 0) if n < count else len(buf)
+                tmp.write(buf[:cut])
+                buf = buf[cut:]
+            tmp.write(buf)
+        if n:
+            shutil.copymode(path, tmp.name)
+            os.replace(tmp.name, path)
+        else:
+            os.unlink(tmp.name)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
+    return n
+
+
+@contextmanager
+def mapped(path):
+    """Map path read-only for the duration of the block.
+
+    Searches and slices read the page cache directly instead of a copy
+    of the file. ``in`` on an mmap tests single byte values, so look for
+    markers with ``find()``. Leave the block before rewriting the file.
+    """
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        if os.fstat(fd).st_size == 0:
+            yield b''  # mmap refuses empty files
+            return
+        with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as view:
+            yield view
+    finally:
+        os.close(fd)
+
+
+def splice(content, edits):
+    """Apply (start, end, replacement) edits to content in one pass.
+
+    Offsets refer to the original content and edits must not overlap;
+    edits at the same offset keep their queued order. Works on str or
+    bytes, building the result with a single join.
+    """
+    parts = []
+    pos = 0
+    for start, end, new in sorted(edits, key=lambda e: e[0]):
+        parts.append(content[pos:start])
+        parts.append(new)
+        pos = end
+    parts.append(content[pos:])
+    return content[:0].join(parts)
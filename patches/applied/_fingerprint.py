@@ -0,0 +1,70 @@
+"""Content hashes of files the patch scripts have already produced.
+
+A target whose SHA-256 is recorded for a script is already patched, so
+the script can stop before scanning for anchors. After a successful run
+``record()`` adds the new hash and rewrites the PATCHED literal below.
+"""
+import ast
+import hashlib
+from pathlib import Path
+
+from _fileio import chunks
+
+# script name -> hashes of its output
+PATCHED = {}
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def file_digest(path):
+    """digest() of the file at path, read in chunks."""
+    h = hashlib.sha256()
+    for block in chunks(path):
+        h.update(block)
+    return h.hexdigest()
+
+
+def already_patched(script, data):
+    """True if ``data`` is a file this script has produced before."""
+    return digest(data) in PATCHED.get(Path(script).name, ())
+
+
+def already_patched_file(script, path):
+    """already_patched() without loading the file into memory."""
+    return file_digest(path) in PATCHED.get(Path(script).name, ())
+
+
+def record(script, data):
+    """Remember ``data`` as patched output of ``script``."""
+    _remember(script, digest(data))
+
+
+def record_file(script, path):
+    """record() the current contents of path."""
+    _remember(script, file_digest(path))
+
+
+def _remember(script, h):
+    hashes = PATCHED.setdefault(Path(script).name, set())
+    if h in hashes:
+        return
+    hashes.add(h)
+
+    src = Path(__file__)
+    text = src.read_text()
+    node = next(n for n in ast.parse(text).body
+                if isinstance(n, ast.Assign)
+                and getattr(n.targets[0], 'id', None) == 'PATCHED')
+    body = ''.join(
+        f"    {name!r}: {{\n"
+        + ''.join(f"        {v!r},\n" for v in sorted(PATCHED[name]))
+        + "    },\n"
+        for name in sorted(PATCHED))
+    lines = text.splitlines(keepends=True)
+    lines[node.lineno - 1:node.end_lineno] = [f"PATCHED = {{\n{body}}}\n"]
+    try:
+        src.write_text(''.join(lines))
+    except OSError:
+        pass  # read-only checkout: the patch itself still succeeded
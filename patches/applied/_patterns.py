@@ -0,0 +1,54 @@
+"""Regex helpers shared by the patch scripts in this directory.
+
+Patterns are bytes and are meant to be applied to ``slurp()`` output.
+Everything goes through ``compiled()``, so scripts run back to back in
+one process (or importing each other) share a single compiled copy.
+"""
+import re
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def compiled(pattern: bytes, flags: int = 0) -> re.Pattern:
+    """Compile pattern once per process."""
+    return re.compile(pattern, flags)
+
+
+def blank_tolerant(block: bytes) -> re.Pattern:
+    """Compile a literal block whose whitespace-only lines match any run
+    of spaces/tabs, so editor-stripped trailing whitespace still matches.
+    """
+    return compiled(rb'\n'.join(
+        rb'[ \t]*' if not line.strip() else re.escape(line)
+        for line in block.split(b'\n')))
+
+
+def ws_tolerant(block: bytes) -> re.Pattern:
+    """Compile a literal block where every run of spaces matches any run
+    of spaces/tabs and each line may carry trailing whitespace.
+    """
+    pattern = re.escape(block)
+    pattern = compiled(rb'(?:\\ )+').sub(lambda _m: rb'[ \t]+', pattern)
+    pattern = pattern.replace(b'\\\n', rb'[ \t]*\n')
+    return compiled(pattern)
+
+
+def alternation(markers: dict) -> re.Pattern:
+    """Compile {name: literal bytes} into one pattern of named groups.
+
+    Where two markers match at the same offset the earlier entry wins,
+    so list a marker before any of its prefixes.
+    """
+    return compiled(b'|'.join(
+        b'(?P<%s>%s)' % (name.encode(), re.escape(marker))
+        for name, marker in markers.items()))
+
+
+def scan(pattern: re.Pattern, data) -> dict:
+    """Map each named group of pattern to the start offsets of its
+    matches in data, found in a single pass.
+    """
+    positions = {}
+    for m in pattern.finditer(data):
+        positions.setdefault(m.lastgroup, []).append(m.start())
+    return positions
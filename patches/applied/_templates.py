@@ -0,0 +1,99 @@
+"""Grouping blocks shared by fix_grouping.py and fix_grouping3.py.
+
+The templates keep the blank separator lines (with their indentation) as
+they appear in server.py; ``patch_grouping`` either drops those lines or
+lets them carry any trailing whitespace.
+"""
+import re
+
+from _fileio import stream_subn
+from _patterns import blank_tolerant, compiled
+
+# Partition-only grouping in the /api/clusters fallback
+GROUP_OLD_TEMPLATE = b'''            if rows:
+                # Group by partition
+                partition_nodes = defaultdict(list)
+                gpu_nodes = set()
+                
+                for row in rows:
+                    node = row['node_name']
+                    partitions = row['partitions'] or 'default'
+                    # Use first partition as primary
+                    primary_partition = partitions.split(',')[0]
+                    partition_nodes[primary_partition].append(node)
+                    
+                    if row['gres'] and 'gpu' in row['gres'].lower():
+                        gpu_nodes.add(node)
+                
+                for partition, nodes in partition_nodes.items():
+                    cluster_id = partition.lower().replace(' ', '-')
+                    clusters[cluster_id] = {
+                        "name": partition,
+                        "description": f"{len(nodes)}-node partition",
+                        "nodes": sorted(nodes),
+                        "gpu_nodes": [n for n in nodes if n in gpu_nodes],
+                        "type": "gpu" if any(n in gpu_nodes for n in nodes) else "cpu"
+                    }'''
+
+# Cluster -> partition grouping that replaces it
+GROUP_NEW_TEMPLATE = b'''            if rows:
+                # Group by cluster, then by partition
+                cluster_data = defaultdict(lambda: defaultdict(list))
+                gpu_nodes = set()
+                
+                for row in rows:
+                    node = row['node_name']
+                    cluster = row['cluster'] or 'default'
+                    partitions = row['partitions'] or 'default'
+                    primary_partition = partitions.split(',')[0]
+                    cluster_data[cluster][primary_partition].append(node)
+                    
+                    if row['gres'] and 'gpu' in row['gres'].lower():
+                        gpu_nodes.add(node)
+                
+                for cluster_name, part_map in cluster_data.items():
+                    all_nodes = []
+                    for p_nodes in part_map.values():
+                        all_nodes.extend(p_nodes)
+                    cluster_id = cluster_name.lower().replace(' ', '-')
+                    clusters[cluster_id] = {
+                        "name": cluster_name,
+                        "description": f"{len(all_nodes)}-node cluster",
+                        "nodes": sorted(all_nodes),
+                        "gpu_nodes": [n for n in all_nodes if n in gpu_nodes],
+                        "type": "gpu" if all_nodes and all(n in gpu_nodes for n in all_nodes) else "cpu",
+                        "partitions": {p: sorted(ns) for p, ns in part_map.items()},
+                    }'''
+
+
+def _compact(block: bytes) -> bytes:
+    """Drop the whitespace-only separator lines."""
+    return b'\n'.join(line for line in block.split(b'\n') if line.strip())
+
+
+def grouping_pattern(tolerant_ws: bool) -> tuple[re.Pattern, bytes]:
+    """Return (compiled old block, replacement) for the chosen matching.
+
+    With tolerant_ws the separator lines must be present but may have
+    lost their trailing whitespace; otherwise the block is matched
+    without them.
+    """
+    if tolerant_ws:
+        return blank_tolerant(GROUP_OLD_TEMPLATE), GROUP_NEW_TEMPLATE
+    return (compiled(re.escape(_compact(GROUP_OLD_TEMPLATE))),
+            _compact(GROUP_NEW_TEMPLATE))
+
+
+def patch_grouping(raw: bytes, *, tolerant_ws: bool) -> tuple[bytes, int]:
+    """Swap the grouping block in raw; returns (raw, replacements)."""
+    old_re, new = grouping_pattern(tolerant_ws)
+    return old_re.subn(lambda _m: new, raw, count=1)
+
+
+def stream_patch_grouping(path, *, tolerant_ws: bool) -> int:
+    """patch_grouping() applied to the file at path without loading it
+    whole; returns the number of replacements.
+    """
+    old_re, new = grouping_pattern(tolerant_ws)
+    # Generous bound on a match: the template plus widened blank lines
+    return stream_subn(path, old_re, new, overlap=2 * len(GROUP_OLD_TEMPLATE))
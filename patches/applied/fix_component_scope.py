@@ -6,6 +6,8 @@ recreate them every render → infinite fetch loop.
 """
 import sys
 
+from _fileio import spit
+
 path = sys.argv[1]
 lines = open(path).readlines()
 
@@ -66,7 +68,7 @@ final = (new_lines[:new_app_line]
          + ['\n']
          + new_lines[new_app_line:])
 
-open(path, 'w').writelines(final)
+spit(path, ''.join(final).encode())
 
 # Verify
 content = open(path).read()
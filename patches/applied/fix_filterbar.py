@@ -3,15 +3,66 @@
 
 Usage: python3 fix_filterbar.py /path/to/nomad/nomad/viz/server.py
 """
+import bisect
 import sys
 
+from _fileio import slurp, spit
+from _fingerprint import already_patched, record
+from _patterns import compiled
+
+# Hyperscan is optional: its DFA scans large generated files much faster
+try:
+    import hyperscan
+    HAS_HYPERSCAN = True
+except ImportError:
+    HAS_HYPERSCAN = False
+
+# The three sentinels, found in one scan of the file:
+#   0: start of a FilterBar definition
+#   1: a "return React.createElement" (must open its line)
+#   2: the <FilterBar/> render that follows that return line
+SENTINELS = (
+    rb'const FilterBar = \(\) =>',
+    rb'return React\.createElement',
+    rb'React\.createElement\(FilterBar\)',
+)
+ANCHORS_RE = compiled(b'|'.join(b'(' + s + b')' for s in SENTINELS))
+# Only whitespace may precede a return sentinel on its line
+RET_INDENT_RE = compiled(rb'\s*')
+
+
+def scan_anchors(data):
+    """Return sorted start offsets of each sentinel, one list per id."""
+    hits = ([], [], [])
+    if HAS_HYPERSCAN:
+        db = hyperscan.Database()
+        db.compile(
+            expressions=list(SENTINELS),
+            ids=[0, 1, 2],
+            elements=len(SENTINELS),
+            flags=[hyperscan.HS_FLAG_SOM_LEFTMOST] * len(SENTINELS))
+
+        def on_match(sentinel_id, start, end, flags, context):
+            hits[sentinel_id].append(start)
+
+        db.scan(data, match_event_handler=on_match)
+        for offsets in hits:
+            offsets.sort()
+    else:
+        for m in ANCHORS_RE.finditer(data):
+            hits[m.lastindex - 1].append(m.start())
+    return hits
+
 path = sys.argv[1]
-content = open(path).read()
+content = slurp(path)
+if already_patched(__file__, content):
+    print("Already patched")
+    sys.exit(0)
 
 # The pattern: const FilterBar = () => ... ; return ...createElement(FilterBar),
 # Replace with: return ...createElement('div', {style: eduStyles.filterBar}, ...selects...)
 
-FILTER_SELECTS = """React.createElement('div', {style: eduStyles.filterBar},
+FILTER_SELECTS = b"""React.createElement('div', {style: eduStyles.filterBar},
                         React.createElement('select', {value: filters.cluster, onChange: e => setFilters({...filters, cluster: e.target.value}), style: eduStyles.select},
                             React.createElement('option', {value: 'all'}, 'All Clusters'),
                             (data.filters.clusters || []).map(c => React.createElement('option', {key: c, value: c}, c))
@@ -28,49 +79,51 @@ FILTER_SELECTS = """React.createElement('div', {style: eduStyles.filterBar},
                         )
                     ),"""
 
-lines = content.split('\n')
-new_lines = []
-skip_until_return = False
-n = 0
 
-i = 0
-while i < len(lines):
-    line = lines[i]
+def line_bounds(pos):
+    start = content.rfind(b'\n', 0, pos) + 1
+    end = content.find(b'\n', pos)
+    return start, (len(content) if end < 0 else end)
 
-    # Detect start of FilterBar definition
-    if 'const FilterBar = () =>' in line:
-        # Skip all lines until we hit the return statement
-        skip_until_return = True
+
+defs, rets, renders = scan_anchors(content)
+
+# Each edit drops the definition lines and swaps the render line
+pieces = []
+last = 0
+n = 0
+for def_pos in defs:
+    def_start, _ = line_bounds(def_pos)
+    if def_start < last:
+        continue
+    # First return after the definition that opens its line
+    i = bisect.bisect_right(rets, def_pos)
+    while i < len(rets):
+        ret_start, ret_end = line_bounds(rets[i])
+        if RET_INDENT_RE.fullmatch(content, ret_start, rets[i]):
+            break
         i += 1
+    else:
         continue
-
-    if skip_until_return:
-        if line.strip().startswith('return React.createElement'):
-            skip_until_return = False
-            # Next line should be React.createElement(FilterBar),
-            # Check the next line
-            if i + 1 < len(lines) and 'React.createElement(FilterBar)' in lines[i + 1]:
-                # Output the return line but replace next line
-                new_lines.append(line)
-                new_lines.append('                    ' + FILTER_SELECTS)
-                i += 2  # skip the FilterBar line
-                n += 1
-                continue
-            else:
-                new_lines.append(line)
-                i += 1
-                continue
-        else:
-            i += 1
-            continue
-
-    new_lines.append(line)
-    i += 1
+    if ret_end == len(content):
+        continue
+    # The render must sit on the very next line
+    render_start, render_end = line_bounds(ret_end + 1)
+    j = bisect.bisect_left(renders, render_start)
+    if j == len(renders) or renders[j] >= render_end:
+        continue
+    pieces += [content[last:def_start], content[ret_start:ret_end + 1],
+               b'                    ' + FILTER_SELECTS]
+    last = render_end
+    n += 1
+pieces.append(content[last:])
 
 if n > 0:
-    open(path, 'w').write('\n'.join(new_lines))
+    patched = b''.join(pieces)
+    spit(path, patched)
+    record(__file__, patched)
     print(f"Fixed {n} FilterBar definitions (inlined)")
 else:
-    print("Could not find FilterBar pattern via line scan")
-    print(f"'const FilterBar' count: {content.count('const FilterBar')}")
-    print(f"'React.createElement(FilterBar)' count: {content.count('React.createElement(FilterBar)')}")
+    print("Could not find FilterBar pattern")
+    print(f"'const FilterBar' count: {content.count(b'const FilterBar')}")
+    print(f"'React.createElement(FilterBar)' count: {content.count(b'React.createElement(FilterBar)')}")
@@ -1,5 +1,8 @@
 #!/usr/bin/env python3
 import sys
+
+from _fileio import spit
+
 path = sys.argv[1]
 content = open(path).read()
 
@@ -57,7 +60,7 @@ new = """            if rows:
 
 if old in content:
     content = content.replace(old, new, 1)
-    open(path, 'w').write(content)
+    spit(path, content.encode())
     print("Fixed! Verify with: grep -n 'Group by cluster' nomad/viz/server.py")
 else:
     print("Block not found exactly. Showing diff...")
@@ -4,10 +4,17 @@ Fix the nodes table loading path to build partition→nodes mapping.
 """
 import sys
 
+from _fileio import slurp, spit
+from _fingerprint import already_patched, record
+from _patterns import ws_tolerant
+
 path = sys.argv[1]
-content = open(path).read()
+raw = slurp(path)
+if already_patched(__file__, raw):
+    print("Already patched")
+    sys.exit(0)
 
-old = '''                for cluster_name, nodes in cluster_nodes.items():
+old = b'''                for cluster_name, nodes in cluster_nodes.items():
                     cluster_id = cluster_name.lower().replace(" ", "-")
                     part_list = sorted(p for p in cluster_partitions[cluster_name] if p)
                     clusters[cluster_id] = {
@@ -19,7 +26,7 @@ old = '''                for cluster_name, nodes in cluster_nodes.items():
                         "type": "gpu" if any(n in gpu_nodes for n in nodes) else "cpu"
                     }'''
 
-new = '''                # Build partition -> nodes mapping
+new = b'''                # Build partition -> nodes mapping
                 partition_node_map = defaultdict(lambda: defaultdict(list))
                 for row in rows:
                     node = row["hostname"]
@@ -41,12 +48,16 @@ new = '''                # Build partition -> nodes mapping
                         "partitions": part_map,
                     }'''
 
-if old in content:
-    content = content.replace(old, new, 1)
-    open(path, 'w').write(content)
+# Tolerate indentation/trailing-whitespace drift around the anchor
+ANCHOR_RE = ws_tolerant(old)
+
+raw, n = ANCHOR_RE.subn(lambda _m: new, raw, count=1)
+if n:
+    spit(path, raw)
+    record(__file__, raw)
     print("Fixed nodes table path - added partitions mapping")
 else:
     print("Could not find block")
     # Debug
-    if "description" in content and "node partition" in content:
+    if raw.find(b"description") >= 0 and raw.find(b"node partition") >= 0:
         print("Found 'node partition' - checking context...")
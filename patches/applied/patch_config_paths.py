@@ -15,9 +15,102 @@ Usage:
 """
 
 import sys
-import shutil
 from pathlib import Path
 
+from _fileio import preserve, slurp, spit
+from _fingerprint import already_patched, record
+
+# ── Edit 1: Add resolve_config_path + fix get_db_path default ────────
+OLD_1 = (
+    b"def get_db_path(config: dict[str, Any]) -> Path:\n"
+    b"    \"\"\"Get database path from config.\"\"\"\n"
+    b"    data_dir = Path(config.get('general', {}).get('data_dir', '/var/lib/nomad'))\n"
+    b"    return data_dir / 'nomad.db'"
+)
+NEW_1 = (
+    b"@lru_cache(maxsize=1)\n"
+    b"def _home() -> Path:\n"
+    b"    \"\"\"Home directory, looked up once per process.\"\"\"\n"
+    b"    return Path.home()\n"
+    b"\n"
+    b"\n"
+    b"@lru_cache(maxsize=1)\n"
+    b"def resolve_config_path() -> str:\n"
+    b"    \"\"\"Find config file: user path first, then system path.\"\"\"\n"
+    b"    user_config = Path(_home(), '.config', 'nomad', 'nomad.toml')\n"
+    b"    system_config = Path('/etc/nomad/nomad.toml')\n"
+    b"    if user_config.exists():\n"
+    b"        return str(user_config)\n"
+    b"    if system_config.exists():\n"
+    b"        return str(system_config)\n"
+    b"    return str(user_config)  # Default to user path even if missing\n"
+    b"\n"
+    b"\n"
+    b"def get_db_path(config: dict[str, Any]) -> Path:\n"
+    b"    \"\"\"Get database path from config.\"\"\"\n"
+    b"    default_data = str(Path(_home(), '.local', 'share', 'nomad'))\n"
+    b"    data_dir = Path(config.get('general', {}).get('data_dir', default_data))\n"
+    b"    return data_dir / 'nomad.db'"
+)
+# The cached helpers above need lru_cache imported
+LRU_IMPORT = b"from functools import lru_cache\n"
+OLD_1_IMPORT = b"from datetime import datetime, timedelta\n"
+NEW_1_IMPORT = OLD_1_IMPORT + LRU_IMPORT
+
+# ── Edit 2: Change --config default from /etc/nomad to None ─────────
+OLD_2 = b"              default='/etc/nomad/nomad.toml',"
+NEW_2 = b"              default=None,"
+
+# ── Edit 3: Use resolve_config_path in cli() ────────────────────────
+OLD_3 = (
+    b"    # Try to load config, but don't fail if not found\n"
+    b"    config_file = Path(config_path)"
+)
+NEW_3 = (
+    b"    # Try to load config, but don't fail if not found\n"
+    b"    if config_path is None:\n"
+    b"        config_path = resolve_config_path()\n"
+    b"    config_file = Path(config_path)"
+)
+
+# ── Edit 4: Fix syscheck hardcoded error message ─────────────────────
+OLD_4A = (
+    "        click.echo(f\"  {click.style('✗', fg='red')}"
+    " Config not found: /etc/nomad/nomad.toml\")\n"
+    "        click.echo(f\"    → Create config or use:"
+    " nomad -c /path/to/config.toml\")"
+).encode()
+NEW_4A = (
+    "        expected = resolve_config_path()\n"
+    "        click.echo(f\"  {click.style('✗', fg='red')}"
+    " Config not found: {expected}\")\n"
+    "        click.echo(f\"    → Run: nomad init\")"
+).encode()
+
+# Flexible fallback for edit 4: rewrite the message line in place and
+# put the ``expected`` lookup in front of it, then fix the hint line
+OLD_4B = b"Config not found: /etc/nomad/nomad.toml"
+NEW_4B = b"Config not found: {expected}"
+OLD_4B_LINE = (
+    "        click.echo(f\"  {click.style('✗', fg='red')}"
+    " Config not found: /etc/nomad/nomad.toml\")"
+).encode()
+NEW_4B_LINE = (
+    b"        expected = resolve_config_path()\n"
+    + OLD_4B_LINE.replace(OLD_4B, NEW_4B)
+)
+OLD_4B_HINT = "    → Create config or use: nomad -c /path/to/config.toml".encode()
+NEW_4B_HINT = "    → Run: nomad init".encode()
+
+
+def _splice(content: bytes, hits: list[tuple[int, bytes, bytes]]) -> bytearray:
+    """Apply (pos, old, new) edits to a single mutable copy of content."""
+    buf = bytearray(content)
+    # Back to front, so earlier offsets stay valid as lengths change
+    for pos, old, new in sorted(hits, key=lambda h: h[0], reverse=True):
+        buf[pos:pos + len(old)] = new
+    return buf
+
 
 def patch(cli_path: str):
     path = Path(cli_path)
@@ -25,124 +118,81 @@ def patch(cli_path: str):
         print(f"ERROR: {cli_path} not found")
         sys.exit(1)
 
-    content = path.read_text()
+    content = slurp(path)
+    if already_patched(__file__, content):
+        print("Already patched")
+        return
+    hits = []
     changes = 0
-
-    # ── Edit 1: Add resolve_config_path + fix get_db_path default ────
-    old_1 = (
-        "def get_db_path(config: dict[str, Any]) -> Path:\n"
-        "    \"\"\"Get database path from config.\"\"\"\n"
-        "    data_dir = Path(config.get('general', {}).get('data_dir', '/var/lib/nomad'))\n"
-        "    return data_dir / 'nomad.db'"
-    )
-    new_1 = (
-        "def resolve_config_path() -> str:\n"
-        "    \"\"\"Find config file: user path first, then system path.\"\"\"\n"
-        "    user_config = Path.home() / '.config' / 'nomad' / 'nomad.toml'\n"
-        "    system_config = Path('/etc/nomad/nomad.toml')\n"
-        "    if user_config.exists():\n"
-        "        return str(user_config)\n"
-        "    if system_config.exists():\n"
-        "        return str(system_config)\n"
-        "    return str(user_config)  # Default to user path even if missing\n"
-        "\n"
-        "\n"
-        "def get_db_path(config: dict[str, Any]) -> Path:\n"
-        "    \"\"\"Get database path from config.\"\"\"\n"
-        "    default_data = str(Path.home() / '.local' / 'share' / 'nomad')\n"
-        "    data_dir = Path(config.get('general', {}).get('data_dir', default_data))\n"
-        "    return data_dir / 'nomad.db'"
-    )
-
-    if old_1 in content:
-        content = content.replace(old_1, new_1)
-        changes += 1
-        print("  ✓ Added resolve_config_path() + fixed get_db_path default")
-    else:
+    missed = 0
+
+    def find(old: bytes, new: bytes) -> bool:
+        pos = content.find(old)
+        if pos < 0:
+            return False
+        hits.append((pos, old, new))
+        return True
+
+    # Edit 1 is only applied together with its import
+    if OLD_1 not in content:
+        missed += 1
         print("  ✗ Could not find get_db_path function")
         print("    (already patched or code has changed)")
+    elif (LRU_IMPORT not in content
+          and not find(OLD_1_IMPORT, NEW_1_IMPORT)):
+        missed += 1
+        print("  ✗ Could not find 'from datetime import datetime,"
+              " timedelta'")
+        print("    (needed to import lru_cache for resolve_config_path)")
+    else:
+        find(OLD_1, NEW_1)
+        changes += 1
+        print("  ✓ Added resolve_config_path() + fixed get_db_path default")
 
-    # ── Edit 2: Change --config default from /etc/nomad to None ─────
-    old_2 = "              default='/etc/nomad/nomad.toml',"
-    new_2 = "              default=None,"
-
-    if old_2 in content:
-        content = content.replace(old_2, new_2)
+    if find(OLD_2, NEW_2):
         changes += 1
         print("  ✓ Changed --config default to None")
     else:
+        missed += 1
         print("  ✗ Could not find --config default='/etc/nomad/nomad.toml'")
         print("    (already patched or code has changed)")
 
-    # ── Edit 3: Use resolve_config_path in cli() ────────────────────
-    old_3 = (
-        "    # Try to load config, but don't fail if not found\n"
-        "    config_file = Path(config_path)"
-    )
-    new_3 = (
-        "    # Try to load config, but don't fail if not found\n"
-        "    if config_path is None:\n"
-        "        config_path = resolve_config_path()\n"
-        "    config_file = Path(config_path)"
-    )
-
-    if old_3 in content:
-        content = content.replace(old_3, new_3)
+    if find(OLD_3, NEW_3):
         changes += 1
         print("  ✓ Updated cli() to use resolve_config_path()")
     else:
+        missed += 1
         print("  ✗ Could not find config_file = Path(config_path)")
         print("    (already patched or code has changed)")
 
-    # ── Edit 4: Fix syscheck hardcoded error message ─────────────────
-    old_4a = (
-        "        click.echo(f\"  {click.style('✗', fg='red')}"
-        " Config not found: /etc/nomad/nomad.toml\")\n"
-        "        click.echo(f\"    → Create config or use:"
-        " nomad -c /path/to/config.toml\")"
-    )
-    new_4a = (
-        "        expected = resolve_config_path()\n"
-        "        click.echo(f\"  {click.style('✗', fg='red')}"
-        " Config not found: {expected}\")\n"
-        "        click.echo(f\"    → Run: nomad init\")"
-    )
-
-    if old_4a in content:
-        content = content.replace(old_4a, new_4a)
+    if find(OLD_4A, NEW_4A):
         changes += 1
         print("  ✓ Fixed syscheck error message")
+    # Try a more flexible match
+    elif find(OLD_4B_LINE, NEW_4B_LINE) or find(OLD_4B, NEW_4B):
+        find(OLD_4B_HINT, NEW_4B_HINT)
+        changes += 1
+        print("  ✓ Fixed syscheck error message (alt match)")
     else:
-        # Try a more flexible match
-        old_4b = "Config not found: /etc/nomad/nomad.toml"
-        if old_4b in content:
-            content = content.replace(old_4b, "Config not found: {expected}")
-            # Also add the expected = line before it
-            old_line = "        click.echo(f\"  {click.style('✗', fg='red')} Config not found: {expected}\")"
-            new_line = "        expected = resolve_config_path()\n" + old_line
-            content = content.replace(old_line, new_line)
-            # Fix the hint line too
-            content = content.replace(
-                "    → Create config or use: nomad -c /path/to/config.toml",
-                "    → Run: nomad init"
-            )
-            changes += 1
-            print("  ✓ Fixed syscheck error message (alt match)")
-        else:
-            print("  ✗ Could not find syscheck error message")
-            print("    (already patched or code has changed)")
+        missed += 1
+        print("  ✗ Could not find syscheck error message")
+        print("    (already patched or code has changed)")
 
     if changes == 0:
         print("\nNo changes made. Already patched?")
         return
 
     # Create backup
-    backup = path.with_suffix('.py.bak')
-    shutil.copy(path, backup)
+    backup = str(path) + '.bak'
+    preserve(path, backup)
     print(f"\nBackup saved: {backup}")
 
     # Write
-    path.write_text(content)
+    patched = _splice(content, hits)
+    spit(path, patched)
+    if not missed:
+        # A partial patch is re-checked on the next run
+        record(__file__, patched)
     print(f"Patched {changes} location(s)")
     print()
     print("Config resolution order is now:")
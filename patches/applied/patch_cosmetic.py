@@ -10,28 +10,24 @@ Usage:
     python3 patch_cosmetic.py /path/to/nomad/nomad/cli.py
 """
 
+import re
 import sys
-import shutil
 from pathlib import Path
 
+from _fileio import preserve, slurp, spit
+from _fingerprint import already_patched, record
+from _patterns import compiled
 
-def patch(cli_path: str):
-    path = Path(cli_path)
-    if not path.exists():
-        print(f"ERROR: {cli_path} not found")
-        sys.exit(1)
-
-    content = path.read_text()
-    changes = 0
 
+# (old, new, found message, missing message)
+FIXES = [
     # ── Fix 1: "groups" → "partitions" for HPC in final summary ──────
-    old_1 = (
+    ((
         '        click.echo(\n'
         '            f"    • {c[\'name\']}:"\n'
         '            f" {pcount} groups,"\n'
         '            f" {ncount} nodes{loc}")'
-    )
-    new_1 = (
+    ).encode(), (
         '        plabel = ("partitions"\n'
         '                  if c.get("type") == "hpc"\n'
         '                  else "groups")\n'
@@ -39,34 +35,52 @@ def patch(cli_path: str):
         '            f"    • {c[\'name\']}:"\n'
         '            f" {pcount} {plabel},"\n'
         '            f" {ncount} nodes{loc}")'
-    )
-
-    if old_1 in content:
-        content = content.replace(old_1, new_1)
-        changes += 1
-        print("  ✓ Fixed partition/group label in final summary")
-    else:
-        print("  ✗ Could not find final summary label block")
-
+    ).encode(),
+     "  ✓ Fixed partition/group label in final summary",
+     "  ✗ Could not find final summary label block"),
     # ── Fix 2: Alignment in show_cluster_summary ─────────────────────
-    old_2 = (
+    ((
         '            click.echo(\n'
         '                f"    {part_label}:  "\n'
         '                f"   {pid}"\n'
         '                f" — {len(pdata[\'nodes\'])} nodes{gpu_info}")'
-    )
-    new_2 = (
+    ).encode(), (
         '            click.echo(\n'
         '                f"    {part_label}:    {pid}"\n'
         '                f" — {len(pdata[\'nodes\'])} nodes{gpu_info}")'
-    )
+    ).encode(),
+     "  ✓ Fixed alignment in cluster summary",
+     "  ✗ Could not find cluster summary alignment block"),
+]
+
+REPLACEMENTS = {old: new for old, new, _, _ in FIXES}
+COSMETIC_RE = compiled(b'|'.join(re.escape(old) for old, _, _, _ in FIXES))
+
+
+def patch(cli_path: str):
+    path = Path(cli_path)
+    if not path.exists():
+        print(f"ERROR: {cli_path} not found")
+        sys.exit(1)
+
+    raw = slurp(path)
+    if already_patched(__file__, raw):
+        print("Already patched")
+        return
+    # One pass over the file; each anchor is only rewritten the first time
+    found = set()
+
+    def dispatch(m):
+        old = m.group(0)
+        if old in found:
+            return old
+        found.add(old)
+        return REPLACEMENTS[old]
 
-    if old_2 in content:
-        content = content.replace(old_2, new_2)
-        changes += 1
-        print("  ✓ Fixed alignment in cluster summary")
-    else:
-        print("  ✗ Could not find cluster summary alignment block")
+    raw = COSMETIC_RE.sub(dispatch, raw)
+    for old, _, fixed, missing in FIXES:
+        print(fixed if old in found else missing)
+    changes = len(found)
 
     if changes == 0:
         print("\nNo changes made. Already patched?")
@@ -74,10 +88,13 @@ def patch(cli_path: str):
 
     # Backup
     backup = path.with_suffix('.py.bak')
-    shutil.copy(path, backup)
+    preserve(path, backup)
     print(f"\nBackup saved: {backup}")
 
-    path.write_text(content)
+    spit(path, raw)
+    if changes == len(FIXES):
+        # A partial patch is re-checked on the next run
+        record(__file__, raw)
     print(f"Patched {changes} location(s)")
     print()
     print("Test with:")
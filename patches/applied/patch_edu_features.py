@@ -19,9 +19,14 @@ Prerequisites:
 """
 
 import sys
-import shutil
+from bisect import bisect_right
 from pathlib import Path
 
+from _edits import Edit, apply_edits
+from _fileio import mapped, preserve, splice, spit
+from _fingerprint import already_patched_file, record_file
+from _patterns import alternation, compiled, scan
+
 
 # =====================================================================
 # NEW CODE TO INSERT
@@ -43,213 +48,480 @@ CLI_WIRING = '''
             collectors.append(GroupCollector(groups_config, db_path))
 '''
 
+# -- Anchors and already-patched probes, one scan per file --
+INIT_MARKERS = {
+    'all_entry': b"'GroupCollector'",
+    'group': b'GroupCollector',
+    'nfs_import': b"from .nfs import NFSCollector",
+    'nfs_entry': b"'NFSCollector',",
+    # Last entry of __all__, without trailing comma
+    'nfs_entry_last': b"'NFSCollector'",
+}
+CLI_MARKERS = {
+    'group': b'GroupCollector',
+    'nfs_import': b"from nomad.collectors.nfs import NFSCollector",
+    'wired': b"'groups' in collector",
+    'interactive': b"    # Interactive session collector",
+    'nfs_append': b"collectors.append(NFSCollector(nfs_config, db_path))",
+}
+
 # -- For dashboard.py: Python API helper functions --
 API_HELPERS = r'''
 
-def query_resource_footprint(db_path, cluster='all', group='all', days=30):
-    """Query resource footprint from job_accounting + group_membership."""
+import gzip as _gzip
+import os as _os
+import sqlite3 as _sql
+import threading as _threading
+from array import array as _array
+from concurrent.futures import ThreadPoolExecutor as _ThreadPoolExecutor
+from functools import lru_cache as _lru_cache
+from hashlib import blake2b as _blake2b
+from heapq import nlargest as _nlargest
+from urllib.parse import unquote_plus as _unquote_plus
+
+# orjson is optional: it encodes the larger API payloads several times faster
+try:
+    import orjson as _orjson
+except ImportError:
+    _orjson = None
+
+# Fallback encoder, built once; compact like orjson's output
+_JSON_ENCODER = json.JSONEncoder(separators=(',', ':'), ensure_ascii=False)
+
+
+def _dumps(obj):
+    """Encode an API payload as JSON bytes, with orjson when available."""
+    if _orjson is not None:
+        return _orjson.dumps(obj)
+    return _JSON_ENCODER.encode(obj).encode()
+
+
+def _params(query):
+    """(cluster, group, days, tab) from an analytics API query string.
+
+    Reads just these keys, with parse_qs() semantics: '+' is a space, the
+    first non-empty value wins, and a missing or bad days means 30.
+    """
+    found = {}
+    for part in query.split('&'):
+        key, _, value = part.partition('=')
+        if value and key not in found:
+            found[key] = value
+    try:
+        days = int(found.get('days', 30))
+    except ValueError:
+        days = 30
+    return (_unquote_plus(found.get('cluster', 'all')),
+            _unquote_plus(found.get('group', 'all')),
+            days, _unquote_plus(found.get('tab', 'all')))
+
+
+# Smaller JSON bodies aren't worth a gzip header
+_GZIP_MIN_BYTES = 1024
+
+
+def _etag(body):
+    """Weak validator for an encoded JSON body, the same gzipped or not."""
+    return 'W/"' + _blake2b(body, digest_size=8).hexdigest() + '"'
+
+
+def _not_modified(headers, etag):
+    """True when the request's If-None-Match already names etag."""
+    inm = headers.get('If-None-Match')
+    if not inm:
+        return False
+    tags = {t.strip().removeprefix('W/') for t in inm.split(',')}
+    return '*' in tags or etag.removeprefix('W/') in tags
+
+
+def _send_json(handler, body, etag=None):
+    """Send an encoded JSON body with an explicit Content-Length.
+
+    The body is gzipped when it is large enough and the client accepts it.
+    With an etag the client is told to revalidate, and a request that
+    already holds this body gets an empty 304 instead.
+    """
+    if etag is not None and _not_modified(handler.headers, etag):
+        handler.send_response(304)
+        handler.send_header('ETag', etag)
+        handler.send_header('Vary', 'Accept-Encoding')
+        handler.end_headers()
+        return
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    if etag is not None:
+        handler.send_header('ETag', etag)
+        handler.send_header('Cache-Control', 'no-cache')
+    if (len(body) >= _GZIP_MIN_BYTES
+            and 'gzip' in handler.headers.get('Accept-Encoding', '')):
+        body = _gzip.compress(body, compresslevel=1)
+        handler.send_header('Content-Encoding', 'gzip')
+    handler.send_header('Vary', 'Accept-Encoding')
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+# One read-only connection per database and role, shared by the handler
+# threads; footprint and heatmap queries get their own so they can overlap
+_RO_CONNS = {}
+_RO_CONNS_LOCK = _threading.Lock()
+
+
+def _shared_ro(db_path, role='main'):
+    """(connection, lock) for db_path and role; hold the lock while querying.
+
+    journal_mode is left to the collectors that write the database, so
+    only reader-side pragmas are set here.
+    """
+    with _RO_CONNS_LOCK:
+        entry = _RO_CONNS.get((db_path, role))
+        if entry is None:
+            from pathlib import Path as _Path
+            uri = _Path(db_path).absolute().as_uri() + '?mode=ro'
+            conn = _sql.connect(uri, uri=True, check_same_thread=False)
+            conn.row_factory = _sql.Row
+            conn.execute("PRAGMA busy_timeout=5000")
+            conn.execute("PRAGMA cache_size=-65536")
+            conn.execute("PRAGMA mmap_size=268435456")
+            entry = _RO_CONNS[db_path, role] = (conn, _threading.Lock())
+    return entry
+
+
+# Runs the second query of a combined /api/dashboard request
+_QUERY_POOL = _ThreadPoolExecutor(max_workers=2)
+
+# /api/groups; one string so the connection's statement cache reuses
+# the prepared statement on every request
+_GROUPS_SQL = """
+    SELECT group_name, cluster, COUNT(*) as members
+    FROM group_membership
+    GROUP BY group_name, cluster
+    ORDER BY group_name, cluster
+"""
+
+# db_path -> (stamp, table names) as last read from sqlite_master
+_RO_TABLES = {}
+
+
+def _table_names(conn, db_path, stamp):
+    """Table names in db_path, re-read only when its stamp changes.
+
+    Call with the connection's lock held.
+    """
+    cached = _RO_TABLES.get(db_path)
+    if cached is None or cached[0] != stamp:
+        cached = _RO_TABLES[db_path] = (stamp, frozenset(
+            r[0] for r in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type='table'")))
+    return cached[1]
+
+
+# db_path -> (stamp, clusters in job_accounting)
+_RO_CLUSTERS = {}
+
+
+def _known_clusters(conn, db_path, stamp):
+    """Distinct job_accounting clusters, re-read only when stamp changes.
+
+    Call with the connection's lock held.
+    """
+    cached = _RO_CLUSTERS.get(db_path)
+    if cached is None or cached[0] != stamp:
+        cached = _RO_CLUSTERS[db_path] = (stamp, tuple(
+            r[0] for r in conn.execute(
+                "SELECT DISTINCT cluster FROM job_accounting")))
+    return cached[1]
+
+
+def _db_stamp(db_path):
+    """(mtime, size) of the database and its WAL; changes on every write."""
+    stamp = []
+    for p in (str(db_path), str(db_path) + '-wal'):
+        try:
+            st = _os.stat(p)
+        except OSError:
+            continue
+        stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def _window_start(days):
+    """ISO timestamp of midnight, days ago."""
     from datetime import datetime as _dt, timedelta as _td
-    start = (_dt.now() - _td(days=int(days))).strftime('%Y-%m-%dT00:00:00')
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    tables = [r[0] for r in c.execute(
-        "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
+    return (_dt.now() - _td(days=int(days))).strftime('%Y-%m-%dT00:00:00')
+
+
+def query_resource_footprint(db_path, cluster='all', group='all', days=30):
+    """Query resource footprint from job_accounting + group_membership.
+
+    Results are cached until the database changes or the window moves.
+    """
+    return _query_resource_footprint(
+        str(db_path), cluster, group, _window_start(days), _db_stamp(db_path))
+
+
+def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
+    """Query activity heatmap from job_accounting submit times.
+
+    Results are cached until the database changes or the window moves.
+    """
+    return _query_activity_heatmap(
+        str(db_path), cluster, group, _window_start(days), _db_stamp(db_path))
+
+
+@_lru_cache(maxsize=64)
+def _query_resource_footprint(db_path, cluster, group, start, stamp):
     empty = {
         'groups': [], 'users': [],
         'totals': {'cpu_hours': 0, 'gpu_hours': 0, 'jobs': 0, 'users': 0},
         'filters': {'clusters': [], 'groups': []},
     }
-    if 'job_accounting' not in tables:
-        conn.close()
+    # No database file (find_database() found none) or one we can't open
+    if not stamp:
         return empty
-    where = ["submit_time >= ?"]
-    params = [start]
-    if cluster != 'all':
-        where.append("cluster = ?")
-        params.append(cluster)
-    c.execute(f"""
-        SELECT username, cluster,
-               SUM(cpu_hours) as cpu_hours,
-               SUM(gpu_hours) as gpu_hours,
-               COUNT(*) as jobs
-        FROM job_accounting
-        WHERE {" AND ".join(where)}
-        GROUP BY username, cluster
-    """, params)
-    user_rows = c.fetchall()
-    grp_map = {}
-    if 'group_membership' in tables:
-        c.execute("SELECT username, group_name FROM group_membership")
-        for row in c.fetchall():
-            grp_map.setdefault(row['username'], []).append(row['group_name'])
-    users = []
-    user_set = set()
-    for row in user_rows:
-        u = row['username']
-        user_set.add(u)
-        ugroups = grp_map.get(u, [])
-        if group != 'all' and group not in ugroups:
-            continue
-        users.append({
-            'username': u, 'cluster': row['cluster'],
-            'cpu_hours': round(row['cpu_hours'] or 0, 1),
-            'gpu_hours': round(row['gpu_hours'] or 0, 1),
-            'jobs': row['jobs'], 'groups': ugroups,
-        })
-    gtotals = {}
-    for u in users:
-        for g in u['groups']:
-            if g not in gtotals:
-                gtotals[g] = {'name': g, 'cpu_hours': 0,
-                              'gpu_hours': 0, 'jobs': 0, 'users': set()}
-            gtotals[g]['cpu_hours'] += u['cpu_hours']
-            gtotals[g]['gpu_hours'] += u['gpu_hours']
-            gtotals[g]['jobs'] += u['jobs']
-            gtotals[g]['users'].add(u['username'])
-    glist = sorted(gtotals.values(), key=lambda x: x['cpu_hours'], reverse=True)
-    for g in glist:
-        g['users'] = len(g['users'])
-    c.execute("SELECT DISTINCT cluster FROM job_accounting")
-    avail_clusters = [r[0] for r in c.fetchall()]
-    avail_groups = sorted(gtotals.keys())
-    conn.close()
-    return {
-        'groups': glist[:20],
-        'users': sorted(users, key=lambda x: x['cpu_hours'], reverse=True)[:100],
-        'totals': {
-            'cpu_hours': round(sum(u['cpu_hours'] for u in users), 1),
-            'gpu_hours': round(sum(u['gpu_hours'] for u in users), 1),
-            'jobs': sum(u['jobs'] for u in users),
-            'users': len(user_set),
-        },
-        'filters': {'clusters': avail_clusters, 'groups': avail_groups},
-    }
+    try:
+        conn, lock = _shared_ro(db_path, 'footprint')
+    except _sql.Error:
+        return empty
+    with lock:
+        c = conn.cursor()
+        tables = _table_names(conn, db_path, stamp)
+        if 'job_accounting' not in tables:
+            return empty
+        known = _known_clusters(conn, db_path, stamp)
+        if cluster != 'all' and cluster not in known:
+            # Nothing can match; skip the scans
+            empty['filters']['clusters'] = list(known)
+            return empty
+        grp_map = {}
+        if 'group_membership' in tables:
+            for row in c.execute(
+                    "SELECT username, group_name FROM group_membership"):
+                grp_map.setdefault(row['username'], []).append(row['group_name'])
+        where = ["submit_time >= ?"]
+        params = [start]
+        if cluster != 'all':
+            where.append("cluster = ?")
+            params.append(cluster)
+        c.execute(f"""
+            SELECT username, cluster,
+                   SUM(cpu_hours) as cpu_hours,
+                   SUM(gpu_hours) as gpu_hours,
+                   COUNT(*) as jobs
+            FROM job_accounting
+            WHERE {" AND ".join(where)}
+            GROUP BY username, cluster
+        """, params)
+        users = []
+        user_set = set()
+        # Stream the rows off the cursor instead of materialising them
+        for row in c:
+            u = row['username']
+            user_set.add(u)
+            ugroups = grp_map.get(u, [])
+            if group != 'all' and group not in ugroups:
+                continue
+            users.append({
+                'username': u, 'cluster': row['cluster'],
+                'cpu_hours': round(row['cpu_hours'] or 0, 1),
+                'gpu_hours': round(row['gpu_hours'] or 0, 1),
+                'jobs': row['jobs'], 'groups': ugroups,
+            })
+        # Per-group totals are aggregated by SQLite; a user counts once per
+        # group even when the membership is listed for several clusters
+        glist = []
+        if 'group_membership' in tables:
+            gwhere = list(where)
+            gparams = list(params)
+            if group != 'all':
+                gwhere.append("username IN (SELECT username"
+                              " FROM group_membership WHERE group_name = ?)")
+                gparams.append(group)
+            c.execute(f"""
+                SELECT gm.group_name AS name,
+                       SUM(j.cpu_hours) AS cpu_hours,
+                       SUM(j.gpu_hours) AS gpu_hours,
+                       COUNT(*) AS jobs,
+                       COUNT(DISTINCT j.username) AS users
+                FROM (SELECT username, cpu_hours, gpu_hours
+                      FROM job_accounting WHERE {" AND ".join(gwhere)}) j
+                JOIN (SELECT DISTINCT username, group_name
+                      FROM group_membership) gm ON gm.username = j.username
+                GROUP BY gm.group_name
+                ORDER BY cpu_hours DESC
+            """, gparams)
+            glist = [{
+                'name': row['name'],
+                'cpu_hours': round(row['cpu_hours'] or 0, 1),
+                'gpu_hours': round(row['gpu_hours'] or 0, 1),
+                'jobs': row['jobs'], 'users': row['users'],
+            } for row in c]
+        avail_clusters = list(_known_clusters(conn, db_path, stamp))
+        avail_groups = sorted(g['name'] for g in glist)
+        return {
+            'groups': glist[:20],
+            # Top 100 by CPU-hours without sorting every user
+            'users': _nlargest(100, users, key=lambda x: x['cpu_hours']),
+            'totals': {
+                'cpu_hours': round(sum(u['cpu_hours'] for u in users), 1),
+                'gpu_hours': round(sum(u['gpu_hours'] for u in users), 1),
+                'jobs': sum(u['jobs'] for u in users),
+                'users': len(user_set),
+            },
+            'filters': {'clusters': avail_clusters, 'groups': avail_groups},
+        }
 
 
-def query_activity_heatmap(db_path, cluster='all', group='all', days=30):
-    """Query activity heatmap from job_accounting submit times."""
-    from datetime import datetime as _dt, timedelta as _td
-    start = (_dt.now() - _td(days=int(days))).strftime('%Y-%m-%dT00:00:00')
-    conn = sqlite3.connect(str(db_path))
-    conn.row_factory = sqlite3.Row
-    c = conn.cursor()
-    tables = [r[0] for r in c.execute(
-        "SELECT name FROM sqlite_master WHERE type='table'").fetchall()]
+@_lru_cache(maxsize=64)
+def _query_activity_heatmap(db_path, cluster, group, start, stamp):
     empty = {
-        'grid': [[0]*24 for _ in range(7)], 'max_value': 0,
+        'grid': [0] * 168, 'max_value': 0,
         'total_jobs': 0, 'busiest': None, 'quietest': None,
         'filters': {'clusters': [], 'groups': []},
     }
-    if 'job_accounting' not in tables:
-        conn.close()
+    # No database file (find_database() found none) or one we can't open
+    if not stamp:
         return empty
-    group_users = None
-    if group != 'all' and 'group_membership' in tables:
-        c.execute(
-            "SELECT username FROM group_membership WHERE group_name = ?",
-            (group,))
-        group_users = set(r[0] for r in c.fetchall())
-    where = ["submit_time >= ?", "submit_time IS NOT NULL"]
-    params = [start]
-    if cluster != 'all':
-        where.append("cluster = ?")
-        params.append(cluster)
-    c.execute(f"""
-        SELECT submit_time, username
-        FROM job_accounting WHERE {" AND ".join(where)}
-    """, params)
-    grid = [[0]*24 for _ in range(7)]
-    total = 0
-    for row in c.fetchall():
-        if group_users is not None and row['username'] not in group_users:
-            continue
-        try:
-            dt = _dt.strptime(row['submit_time'][:19], '%Y-%m-%dT%H:%M:%S')
-            grid[dt.weekday()][dt.hour] += 1
-            total += 1
-        except (ValueError, TypeError):
-            continue
-    max_val = 0
-    busiest = {'day': 'Monday', 'hour': 0, 'count': 0}
-    quietest = {'day': 'Monday', 'hour': 0, 'count': 999999}
-    dnames = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
-              'Friday', 'Saturday', 'Sunday']
-    for di in range(7):
-        for hi in range(24):
-            v = grid[di][hi]
-            if v > max_val:
-                max_val = v
-                busiest = {'day': dnames[di], 'hour': hi, 'count': v}
-            if v < quietest['count']:
-                quietest = {'day': dnames[di], 'hour': hi, 'count': v}
-    if quietest['count'] == 999999:
-        quietest['count'] = 0
-    c.execute("SELECT DISTINCT cluster FROM job_accounting")
-    avail_clusters = [r[0] for r in c.fetchall()]
-    avail_groups = []
-    if 'group_membership' in tables:
-        c.execute(
-            "SELECT DISTINCT group_name FROM group_membership"
-            " ORDER BY group_name")
-        avail_groups = [r[0] for r in c.fetchall()]
-    conn.close()
-    return {
-        'grid': grid, 'max_value': max_val, 'total_jobs': total,
-        'busiest': busiest, 'quietest': quietest,
-        'filters': {'clusters': avail_clusters, 'groups': avail_groups},
-    }
+    try:
+        conn, lock = _shared_ro(db_path, 'heatmap')
+    except _sql.Error:
+        return empty
+    with lock:
+        c = conn.cursor()
+        tables = _table_names(conn, db_path, stamp)
+        if 'job_accounting' not in tables:
+            return empty
+        where = ["submit_time >= ?", "submit_time IS NOT NULL"]
+        params = [start]
+        if cluster != 'all':
+            where.append("cluster = ?")
+            params.append(cluster)
+        if group != 'all' and 'group_membership' in tables:
+            where.append("username IN (SELECT username"
+                         " FROM group_membership WHERE group_name = ?)")
+            params.append(group)
+        # SQLite buckets submit times by (Monday-first) weekday and hour;
+        # unparseable times come back NULL and are dropped by HAVING
+        c.execute(f"""
+            SELECT (CAST(strftime('%w', substr(submit_time, 1, 19)) AS INTEGER)
+                    + 6) % 7 AS dow,
+                   CAST(strftime('%H', substr(submit_time, 1, 19)) AS INTEGER)
+                       AS hr,
+                   COUNT(*) AS n
+            FROM job_accounting WHERE {" AND ".join(where)}
+            GROUP BY dow, hr
+            HAVING dow IS NOT NULL AND hr IS NOT NULL
+        """, params)
+        # Flat 7x24 counts, indexed day * 24 + hour
+        grid = _array('q', bytes(8 * 168))
+        total = 0
+        for row in c:
+            grid[row['dow'] * 24 + row['hr']] += row['n']
+            total += row['n']
+        dnames = ['Monday', 'Tuesday', 'Wednesday', 'Thursday',
+                  'Friday', 'Saturday', 'Sunday']
+        # max()/min()/index() scan the array in C; index() returns the
+        # first cell, so ties still go to the earliest day and hour
+        max_val = max(grid)
+        bi = grid.index(max_val)
+        min_val = min(grid)
+        qi = grid.index(min_val)
+        busiest = {'day': dnames[bi // 24], 'hour': bi % 24, 'count': max_val}
+        quietest = {'day': dnames[qi // 24], 'hour': qi % 24, 'count': min_val}
+        avail_clusters = list(_known_clusters(conn, db_path, stamp))
+        avail_groups = []
+        if 'group_membership' in tables:
+            c.execute(
+                "SELECT DISTINCT group_name FROM group_membership"
+                " ORDER BY group_name")
+            avail_groups = [r[0] for r in c]
+        return {
+            # Sent flat, cell day * 24 + hour; the panel splits the rows
+            'grid': grid.tolist(),
+            'max_value': max_val, 'total_jobs': total,
+            'busiest': busiest, 'quietest': quietest,
+            'filters': {'clusters': avail_clusters, 'groups': avail_groups},
+        }
+
+
+def footprint_json(db_path, cluster='all', group='all', days=30):
+    """query_resource_footprint() as encoded JSON, cached the same way."""
+    return _footprint_json(
+        str(db_path), cluster, group, _window_start(days), _db_stamp(db_path))
+
+
+def heatmap_json(db_path, cluster='all', group='all', days=30):
+    """query_activity_heatmap() as encoded JSON, cached the same way."""
+    return _heatmap_json(
+        str(db_path), cluster, group, _window_start(days), _db_stamp(db_path))
+
+
+def dashboard_json(db_path, tab='all', cluster='all', group='all', days=30):
+    """Footprint and/or heatmap as one encoded /api/dashboard body.
+
+    ``tab`` is 'resources' (footprint only), 'activity' (heatmap only)
+    or 'all'; anything else is treated as 'all'. Each part comes from
+    the same cache as its own endpoint; for 'all' the heatmap is
+    computed on a worker thread meanwhile.
+    """
+    key = (str(db_path), cluster, group, _window_start(days),
+           _db_stamp(db_path))
+    if tab == 'resources':
+        return b'{"footprint":' + _footprint_json(*key) + b'}'
+    if tab == 'activity':
+        return b'{"heatmap":' + _heatmap_json(*key) + b'}'
+    heatmap = _QUERY_POOL.submit(_heatmap_json, *key)
+    return (b'{"footprint":' + _footprint_json(*key)
+            + b',"heatmap":' + heatmap.result() + b'}')
+
+
+@_lru_cache(maxsize=64)
+def _footprint_json(db_path, cluster, group, start, stamp):
+    return _dumps(_query_resource_footprint(
+        db_path, cluster, group, start, stamp))
+
+
+@_lru_cache(maxsize=64)
+def _heatmap_json(db_path, cluster, group, start, stamp):
+    return _dumps(_query_activity_heatmap(
+        db_path, cluster, group, start, stamp))
 
 '''
 
 # -- For dashboard.py: API endpoint handlers --
 API_ENDPOINTS = r'''        elif parsed.path.startswith('/api/footprint'):
-            query = parse_qs(parsed.query)
-            fp_cluster = query.get('cluster', ['all'])[0]
-            fp_group = query.get('group', ['all'])[0]
-            fp_days = int(query.get('days', [30])[0])
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            fp_cluster, fp_group, fp_days, _ = _params(parsed.query)
             dm = DashboardHandler.data_manager
-            result = query_resource_footprint(
-                dm.db_path, fp_cluster, fp_group, fp_days)
-            self.wfile.write(json.dumps(result).encode())
+            body = footprint_json(dm.db_path, fp_cluster, fp_group, fp_days)
+            _send_json(self, body, _etag(body))
         elif parsed.path.startswith('/api/heatmap'):
-            query = parse_qs(parsed.query)
-            hm_cluster = query.get('cluster', ['all'])[0]
-            hm_group = query.get('group', ['all'])[0]
-            hm_days = int(query.get('days', [30])[0])
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
+            hm_cluster, hm_group, hm_days, _ = _params(parsed.query)
+            dm = DashboardHandler.data_manager
+            body = heatmap_json(dm.db_path, hm_cluster, hm_group, hm_days)
+            _send_json(self, body, _etag(body))
+        elif parsed.path.startswith('/api/dashboard'):
+            # Everything a tab needs in one round trip
+            db_cluster, db_group, db_days, db_tab = _params(parsed.query)
             dm = DashboardHandler.data_manager
-            result = query_activity_heatmap(
-                dm.db_path, hm_cluster, hm_group, hm_days)
-            self.wfile.write(json.dumps(result).encode())
+            body = dashboard_json(
+                dm.db_path, db_tab, db_cluster, db_group, db_days)
+            _send_json(self, body, _etag(body))
         elif parsed.path == '/api/groups':
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.end_headers()
             dm = DashboardHandler.data_manager
             try:
-                conn = sqlite3.connect(str(dm.db_path))
-                conn.row_factory = sqlite3.Row
-                c = conn.cursor()
-                c.execute("""
-                    SELECT group_name, cluster, COUNT(*) as members
-                    FROM group_membership
-                    GROUP BY group_name, cluster
-                    ORDER BY group_name
-                """)
-                groups = [dict(r) for r in c.fetchall()]
-                conn.close()
+                conn, lock = _shared_ro(str(dm.db_path))
+                with lock:
+                    # Plain tuples, built straight into the response dicts
+                    c = conn.cursor()
+                    c.row_factory = None
+                    groups = [
+                        {'group_name': g, 'cluster': cl, 'members': n}
+                        for g, cl, n in c.execute(_GROUPS_SQL)]
             except Exception:
                 groups = []
-            self.wfile.write(json.dumps({'groups': groups}).encode())
+            _send_json(self, _dumps({'groups': groups}))
 '''
 
 # -- For dashboard.py: new React tab buttons (after Interactive tab) --
@@ -284,6 +556,29 @@ RENDER_NEW = (
     "                        ) : ("
 )
 
+# -- Anchors and already-patched probes in dashboard.py --
+# All of them are located by one scan of the file
+DASHBOARD_MARKERS = {
+    'helpers': b'query_resource_footprint',
+    'handler': b'class DashboardHandler',
+    'endpoints': b'/api/footprint',
+    'send404': b"        else:\n            self.send_error(404)",
+    'tabs': b"activeTab === 'resources'",
+    'interactive': (b"                                Interactive\n"
+                    b"                            </div>"),
+    # Same tab with different indentation
+    'interactive_short': b"Interactive\n                            </div>",
+    'rendered': b"<ResourcesPanel />",
+    'render_old': RENDER_OLD.encode(),
+    'components': b'const ResourcesPanel',
+    'active_tab': b'const [activeTab,',
+}
+DASHBOARD_MARKERS_RE = alternation(DASHBOARD_MARKERS)
+# RENDER_OLD with flexible whitespace
+RENDER_RE = compiled(
+    rb"\)\s*:\s*activeTab\s*===\s*'interactive'\s*\?\s*\(\s*"
+    rb"<InteractiveView\s*/>\s*\)\s*:\s*\(")
+
 # -- For dashboard.py: React component definitions --
 # These get inserted before the App component declaration
 REACT_COMPONENTS = r'''
@@ -321,41 +616,61 @@ REACT_COMPONENTS = r'''
                 legendBar: { display: 'flex', gap: '1px', borderRadius: '3px', overflow: 'hidden' },
             };
 
+            // 256 shades cover the gradient's 180-step green channel, so heatmap
+            // cells index this table instead of formatting a color each
+            const eduColorTable = Array.from({length: 256}, (_, k) => {
+                const i = k / 255;
+                return 'rgb(' + Math.round(20 + i * 20) + ',' + Math.round(40 + i * 180) + ',' + Math.round(20 + i * 60) + ')';
+            });
+
+            // The heatmap legend never changes, so its swatches are styled once
+            const eduLegendSwatches = [0, 0.2, 0.4, 0.6, 0.8, 1.0].map(i => ({
+                width: '16px', height: '12px', backgroundColor: eduColorTable[Math.round(i * 255)]
+            }));
+
+            // Shared by both panels. Defined once out here, so React sees the same
+            // component type on every render and keeps the selects mounted
+            const EduFilterBar = ({filters, setFilters, options}) => React.createElement('div', {style: eduStyles.filterBar},
+                React.createElement('select', {value: filters.cluster, onChange: e => setFilters({...filters, cluster: e.target.value}), style: eduStyles.select},
+                    React.createElement('option', {value: 'all'}, 'All Clusters'),
+                    (options.clusters || []).map(c => React.createElement('option', {key: c, value: c}, c))
+                ),
+                React.createElement('select', {value: filters.group, onChange: e => setFilters({...filters, group: e.target.value}), style: eduStyles.select},
+                    React.createElement('option', {value: 'all'}, 'All Groups'),
+                    (options.groups || []).map(g => React.createElement('option', {key: g, value: g}, g))
+                ),
+                React.createElement('select', {value: filters.days, onChange: e => setFilters({...filters, days: e.target.value}), style: eduStyles.select},
+                    React.createElement('option', {value: '7'}, 'Last 7 days'),
+                    React.createElement('option', {value: '30'}, 'Last 30 days'),
+                    React.createElement('option', {value: '90'}, 'Last 90 days'),
+                    React.createElement('option', {value: '365'}, 'Last year')
+                )
+            );
+
             const ResourcesPanel = () => {
                 const [data, setData] = useState(null);
                 const [filters, setFilters] = useState({cluster: 'all', group: 'all', days: '30'});
                 const [sort, setSort] = useState({by: 'cpu_hours', dir: 'desc'});
                 useEffect(() => {
                     const {cluster, group, days} = filters;
-                    fetch('/api/footprint?cluster=' + cluster + '&group=' + group + '&days=' + days)
-                        .then(r => r.json()).then(setData).catch(() => setData(null));
+                    fetch('/api/dashboard?tab=resources&cluster=' + cluster + '&group=' + group + '&days=' + days)
+                        .then(r => r.json()).then(d => setData(d.footprint)).catch(() => setData(null));
                 }, [filters]);
-                if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading resource data...');
-                const maxCpu = Math.max(...data.groups.map(g => g.cpu_hours), 1);
-                const maxGpu = Math.max(...data.groups.map(g => g.gpu_hours), 1);
-                const sorted_users = [...(data.users || [])].sort((a, b) => {
+                // Bar widths only change with the data, so their styles are built once per fetch
+                const barStyles = useMemo(() => {
+                    if (!data) return [];
+                    const maxCpu = data.groups.reduce((m, g) => Math.max(m, g.cpu_hours), 1);
+                    return data.groups.map(g => ({...eduStyles.barFill, width: (g.cpu_hours / maxCpu * 100) + '%'}));
+                }, [data]);
+                // Re-sorted only when the data or the sort order changes, not on every render
+                const sorted_users = useMemo(() => [...((data && data.users) || [])].sort((a, b) => {
                     if (sort.by === 'username') return sort.dir === 'asc' ? a.username.localeCompare(b.username) : b.username.localeCompare(a.username);
                     return sort.dir === 'desc' ? (b[sort.by] || 0) - (a[sort.by] || 0) : (a[sort.by] || 0) - (b[sort.by] || 0);
-                });
+                }), [data, sort]);
+                if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading resource data...');
                 const doSort = (col) => setSort({by: col, dir: sort.by === col && sort.dir === 'desc' ? 'asc' : 'desc'});
-                const FilterBar = () => React.createElement('div', {style: eduStyles.filterBar},
-                    React.createElement('select', {value: filters.cluster, onChange: e => setFilters({...filters, cluster: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: 'all'}, 'All Clusters'),
-                        (data.filters.clusters || []).map(c => React.createElement('option', {key: c, value: c}, c))
-                    ),
-                    React.createElement('select', {value: filters.group, onChange: e => setFilters({...filters, group: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: 'all'}, 'All Groups'),
-                        (data.filters.groups || []).map(g => React.createElement('option', {key: g, value: g}, g))
-                    ),
-                    React.createElement('select', {value: filters.days, onChange: e => setFilters({...filters, days: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: '7'}, 'Last 7 days'),
-                        React.createElement('option', {value: '30'}, 'Last 30 days'),
-                        React.createElement('option', {value: '90'}, 'Last 90 days'),
-                        React.createElement('option', {value: '365'}, 'Last year')
-                    )
-                );
                 return React.createElement('div', {style: eduStyles.panel},
-                    React.createElement(FilterBar),
+                    React.createElement(EduFilterBar, {filters, setFilters, options: data.filters}),
                     React.createElement('div', {style: eduStyles.cards},
                         React.createElement('div', {style: eduStyles.card},
                             React.createElement('div', {style: eduStyles.cardValue}, Math.round(data.totals.cpu_hours).toLocaleString()),
@@ -377,10 +692,10 @@ REACT_COMPONENTS = r'''
                     data.groups.length > 0 && React.createElement('div', null,
                         React.createElement('div', {style: eduStyles.section}, 'Resource Usage by Group'),
                         React.createElement('div', {style: eduStyles.barChart},
-                            data.groups.map(g => React.createElement('div', {key: g.name, style: eduStyles.barRow},
+                            data.groups.map((g, gi) => React.createElement('div', {key: g.name, style: eduStyles.barRow},
                                 React.createElement('div', {style: eduStyles.barLabel}, g.name),
                                 React.createElement('div', {style: eduStyles.barTrack},
-                                    React.createElement('div', {style: {...eduStyles.barFill, width: (g.cpu_hours / maxCpu * 100) + '%'}})
+                                    React.createElement('div', {style: barStyles[gi]})
                                 ),
                                 React.createElement('div', {style: eduStyles.barValue},
                                     Math.round(g.cpu_hours).toLocaleString() + ' CPU-hrs' +
@@ -419,34 +734,22 @@ REACT_COMPONENTS = r'''
                 const [filters, setFilters] = useState({cluster: 'all', group: 'all', days: '30'});
                 useEffect(() => {
                     const {cluster, group, days} = filters;
-                    fetch('/api/heatmap?cluster=' + cluster + '&group=' + group + '&days=' + days)
-                        .then(r => r.json()).then(setData).catch(() => setData(null));
+                    fetch('/api/dashboard?tab=activity&cluster=' + cluster + '&group=' + group + '&days=' + days)
+                        .then(r => r.json()).then(d => setData(d.heatmap)).catch(() => setData(null));
                 }, [filters]);
+                // Same for the 168 heatmap cells: filter changes re-render without re-spreading them
+                const cellStyles = useMemo(() => {
+                    if (!data) return [];
+                    const scale = 255 / (data.max_value || 1);
+                    const getColor = (v) => v ? eduColorTable[Math.min(Math.round(v * scale), 255)] : 'rgba(255,255,255,0.03)';
+                    return data.grid.map(v => ({...eduStyles.hmCell, backgroundColor: getColor(v)}));
+                }, [data]);
+                // The API sends the 7x24 grid flat; split it into day rows once per fetch
+                const rows = useMemo(() => data ? Array.from({length: 7}, (_, di) => data.grid.slice(di * 24, di * 24 + 24)) : [], [data]);
                 if (!data) return React.createElement('div', {style: eduStyles.loading}, 'Loading activity data...');
                 const dayNames = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun'];
-                const getColor = (v) => {
-                    if (!v) return 'rgba(255,255,255,0.03)';
-                    const i = Math.min(v / (data.max_value || 1), 1);
-                    return 'rgb(' + Math.round(20 + i * 20) + ',' + Math.round(40 + i * 180) + ',' + Math.round(20 + i * 60) + ')';
-                };
-                const FilterBar = () => React.createElement('div', {style: eduStyles.filterBar},
-                    React.createElement('select', {value: filters.cluster, onChange: e => setFilters({...filters, cluster: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: 'all'}, 'All Clusters'),
-                        (data.filters.clusters || []).map(c => React.createElement('option', {key: c, value: c}, c))
-                    ),
-                    React.createElement('select', {value: filters.group, onChange: e => setFilters({...filters, group: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: 'all'}, 'All Groups'),
-                        (data.filters.groups || []).map(g => React.createElement('option', {key: g, value: g}, g))
-                    ),
-                    React.createElement('select', {value: filters.days, onChange: e => setFilters({...filters, days: e.target.value}), style: eduStyles.select},
-                        React.createElement('option', {value: '7'}, 'Last 7 days'),
-                        React.createElement('option', {value: '30'}, 'Last 30 days'),
-                        React.createElement('option', {value: '90'}, 'Last 90 days'),
-                        React.createElement('option', {value: '365'}, 'Last year')
-                    )
-                );
                 return React.createElement('div', {style: eduStyles.panel},
-                    React.createElement(FilterBar),
+                    React.createElement(EduFilterBar, {filters, setFilters, options: data.filters}),
                     React.createElement('div', {style: eduStyles.cards},
                         React.createElement('div', {style: eduStyles.card},
                             React.createElement('div', {style: eduStyles.cardValue}, (data.total_jobs || 0).toLocaleString()),
@@ -467,11 +770,11 @@ REACT_COMPONENTS = r'''
                             React.createElement('div', {style: eduStyles.hmLabelCell}),
                             Array.from({length: 24}, (_, i) => React.createElement('div', {key: i, style: eduStyles.hmHourLabel}, i % 3 === 0 ? i + 'h' : ''))
                         ),
-                        data.grid.map((row, di) => React.createElement('div', {key: di, style: eduStyles.hmRow},
+                        rows.map((row, di) => React.createElement('div', {key: di, style: eduStyles.hmRow},
                             React.createElement('div', {style: eduStyles.hmDayLabel}, dayNames[di]),
                             row.map((v, hi) => React.createElement('div', {
                                 key: hi,
-                                style: {...eduStyles.hmCell, backgroundColor: getColor(v)},
+                                style: cellStyles[di * 24 + hi],
                                 title: dayNames[di] + ' ' + hi + ':00 -- ' + v + ' jobs'
                             }))
                         ))
@@ -479,10 +782,7 @@ REACT_COMPONENTS = r'''
                     React.createElement('div', {style: eduStyles.legend},
                         React.createElement('span', {style: eduStyles.legendLabel}, 'Less'),
                         React.createElement('div', {style: eduStyles.legendBar},
-                            [0, 0.2, 0.4, 0.6, 0.8, 1.0].map(i => React.createElement('div', {
-                                key: i,
-                                style: {width: '16px', height: '12px', backgroundColor: 'rgb(' + Math.round(20+i*20) + ',' + Math.round(40+i*180) + ',' + Math.round(20+i*60) + ')'}
-                            }))
+                            eduLegendSwatches.map((style, i) => React.createElement('div', {key: i, style}))
                         ),
                         React.createElement('span', {style: eduStyles.legendLabel}, 'More')
                     )
@@ -491,6 +791,41 @@ REACT_COMPONENTS = r'''
 
 '''
 
+# -- The payloads above as bytes, encoded once --
+GROUPS_IMPORT_B = GROUPS_IMPORT.encode()
+GROUPS_ALLALL_B = GROUPS_ALLALL.encode()
+CLI_IMPORT_B = CLI_IMPORT.encode()
+CLI_WIRING_B = CLI_WIRING.encode()
+API_HELPERS_B = API_HELPERS.encode()
+API_ENDPOINTS_B = API_ENDPOINTS.encode()
+TAB_BUTTONS_B = TAB_BUTTONS.encode()
+RENDER_NEW_B = RENDER_NEW.encode()
+REACT_COMPONENTS_B = REACT_COMPONENTS.encode()
+
+# -- What goes where in collectors/__init__.py and cli.py --
+INIT_EDITS = [
+    Edit(done=('group', 'all_entry'),
+         anchors=(('nfs_import', 'after', b"\n" + GROUPS_IMPORT_B),),
+         missing="  ! Could not find NFS import marker"),
+    Edit(done=('all_entry',),
+         anchors=(('nfs_entry', 'after', b"\n    " + GROUPS_ALLALL_B + b","),
+                  # Try without trailing comma
+                  ('nfs_entry_last', 'after',
+                   b",\n    " + GROUPS_ALLALL_B)),
+         missing="  ! Could not find NFSCollector in __all__"),
+]
+CLI_EDITS = [
+    Edit(done=('group',),
+         anchors=(('nfs_import', 'after', b"\n" + CLI_IMPORT_B),),
+         missing="  ! Could not find NFS import in cli.py"),
+    # Insert before the interactive session collector, else after the
+    # NFS block
+    Edit(done=('wired',),
+         anchors=(('interactive', 'before', CLI_WIRING_B.rstrip() + b"\n\n"),
+                  ('nfs_append', 'after', b"\n" + CLI_WIRING_B)),
+         missing="  ! Could not find insertion point for collector wiring"),
+]
+
 
 # =====================================================================
 # PATCH FUNCTIONS
@@ -498,104 +833,14 @@ REACT_COMPONENTS = r'''
 
 def patch_collectors_init(nomad_dir):
     """Add GroupCollector to collectors/__init__.py."""
-    path = nomad_dir / 'collectors' / '__init__.py'
-    if not path.exists():
-        print(f"  ! {path} not found")
-        return False
-
-    content = path.read_text()
-    changes = 0
-
-    # Add import
-    if 'GroupCollector' not in content:
-        marker = "from .nfs import NFSCollector"
-        if marker in content:
-            content = content.replace(
-                marker,
-                marker + "\n" + GROUPS_IMPORT)
-            changes += 1
-        else:
-            print("  ! Could not find NFS import marker")
-
-    # Add to __all__
-    if "'GroupCollector'" not in content:
-        marker = "'NFSCollector',"
-        if marker in content:
-            content = content.replace(
-                marker,
-                marker + "\n    " + GROUPS_ALLALL + ",")
-            changes += 1
-        else:
-            # Try without trailing comma
-            marker2 = "'NFSCollector'"
-            if marker2 in content:
-                content = content.replace(
-                    marker2,
-                    marker2 + ",\n    " + GROUPS_ALLALL)
-                changes += 1
-
-    if changes > 0:
-        path.write_text(content)
-        print(f"  + collectors/__init__.py ({changes} edits)")
-        return True
-    else:
-        print("  = collectors/__init__.py (already patched)")
-        return True
+    return apply_edits(__file__, nomad_dir / 'collectors' / '__init__.py',
+                       'collectors/__init__.py', INIT_MARKERS, INIT_EDITS)
 
 
 def patch_cli(nomad_dir):
     """Wire GroupCollector into cli.py collect() command."""
-    path = nomad_dir / 'cli.py'
-    if not path.exists():
-        print(f"  ! {path} not found")
-        return False
-
-    content = path.read_text()
-    changes = 0
-
-    # Add import
-    if 'GroupCollector' not in content:
-        marker = "from nomad.collectors.nfs import NFSCollector"
-        if marker in content:
-            content = content.replace(
-                marker,
-                marker + "\n" + CLI_IMPORT)
-            changes += 1
-        else:
-            print("  ! Could not find NFS import in cli.py")
-
-    # Add wiring (insert after NFS collector block)
-    if "'groups' in collector" not in content:
-        # Find the interactive session collector comment
-        # and insert before it
-        marker = "    # Interactive session collector"
-        if marker in content:
-            content = content.replace(
-                marker,
-                CLI_WIRING.rstrip() + "\n\n" + marker)
-            changes += 1
-        else:
-            # Try inserting after NFS block
-            marker2 = "collectors.append(NFSCollector(nfs_config, db_path))"
-            if marker2 in content:
-                # Find the end of the NFS if-block
-                idx = content.index(marker2) + len(marker2)
-                content = (content[:idx] + "\n"
-                           + CLI_WIRING + content[idx:])
-                changes += 1
-            else:
-                print("  ! Could not find insertion point for"
-                      " collector wiring")
-
-    if changes > 0:
-        backup = path.with_suffix('.py.bak')
-        shutil.copy(path, backup)
-        path.write_text(content)
-        print(f"  + cli.py ({changes} edits)")
-        return True
-    else:
-        print("  = cli.py (already patched)")
-        return True
+    return apply_edits(__file__, nomad_dir / 'cli.py', 'cli.py',
+                       CLI_MARKERS, CLI_EDITS, backup=True)
 
 
 def patch_dashboard(nomad_dir):
@@ -605,149 +850,160 @@ def patch_dashboard(nomad_dir):
         print(f"  ! {path} not found")
         return False
 
-    content = path.read_text()
+    if already_patched_file(__file__, path):
+        print("  = dashboard.py (already patched)")
+        return True
+
     changes = 0
+    missed = 0
+    # Every edit is queued as (start, end, replacement) against the
+    # original bytes and spliced in once at the end
+    edits = []
+    with mapped(path) as content:
+        positions = scan(DASHBOARD_MARKERS_RE, content)
+        # Offset of the first byte of every line
+        line_starts = [0, *(m.end()
+                            for m in compiled(rb'\n').finditer(content))]
+
+        def line(i):
+            """Line i of content, without its newline."""
+            if i + 1 < len(line_starts):
+                return content[line_starts[i]:line_starts[i + 1] - 1]
+            return content[line_starts[i]:]
 
-    # 1. Insert API helper functions before DashboardHandler class
-    if 'query_resource_footprint' not in content:
-        marker = "class DashboardHandler"
-        if marker in content:
-            idx = content.index(marker)
-            content = (content[:idx]
-                       + API_HELPERS
-                       + "\n" + content[idx:])
-            changes += 1
-            print("    + API helper functions")
-        else:
-            print("    ! Could not find DashboardHandler class")
-
-    # 2. Insert API endpoints before send_error(404)
-    if '/api/footprint' not in content:
-        marker = "        else:\n            self.send_error(404)"
-        if marker in content:
-            content = content.replace(
-                marker,
-                API_ENDPOINTS + marker)
-            changes += 1
-            print("    + API endpoints (/api/footprint,"
-                  " /api/heatmap, /api/groups)")
-        else:
-            print("    ! Could not find send_error(404) marker")
-
-    # 3. Insert tab buttons after Interactive tab
-    if "activeTab === 'resources'" not in content:
-        marker = (
-            "                                Interactive\n"
-            "                            </div>")
-        # Also try with different whitespace
-        markers = [
-            marker,
-            "Interactive\n                            </div>",
-        ]
-        inserted = False
-        for m in markers:
-            if m in content:
-                content = content.replace(
-                    m, m + TAB_BUTTONS, 1)
+        def line_of(pos):
+            """Index of the line containing offset pos."""
+            return bisect_right(line_starts, pos) - 1
+
+        def insert_line(at, text):
+            """Queue text as a new line before line at (or after the last)."""
+            if at < len(line_starts):
+                edits.append((line_starts[at], line_starts[at], text + b'\n'))
+            else:
+                edits.append((len(content), len(content), b'\n' + text))
+
+        # 1. Insert API helper functions before DashboardHandler class
+        if 'helpers' not in positions:
+            if 'handler' in positions:
+                idx = positions['handler'][0]
+                edits.append((idx, idx, API_HELPERS_B + b"\n"))
                 changes += 1
-                inserted = True
-                print("    + Tab buttons (Resources, Activity)")
-                break
-        if not inserted:
-            # Try line-based approach
-            lines = content.split('\n')
-            for i, line in enumerate(lines):
-                if ('Interactive' in line
-                        and '</div>' in line):
-                    lines.insert(i + 1, TAB_BUTTONS)
-                    content = '\n'.join(lines)
-                    changes += 1
-                    inserted = True
-                    print("    + Tab buttons (line-based)")
-                    break
-                if ('Interactive' in line
-                        and i + 1 < len(lines)
-                        and '</div>' in lines[i + 1]):
-                    lines.insert(i + 2, TAB_BUTTONS)
-                    content = '\n'.join(lines)
+                print("    + API helper functions")
+            else:
+                missed += 1
+                print("    ! Could not find DashboardHandler class")
+
+        # 2. Insert API endpoints before send_error(404)
+        if 'endpoints' not in positions:
+            if 'send404' in positions:
+                for idx in positions['send404']:
+                    edits.append((idx, idx, API_ENDPOINTS_B))
+                changes += 1
+                print("    + API endpoints (/api/footprint,"
+                      " /api/heatmap, /api/groups)")
+            else:
+                missed += 1
+                print("    ! Could not find send_error(404) marker")
+
+        # 3. Insert tab buttons after Interactive tab
+        if 'tabs' not in positions:
+            inserted = False
+            # Also try with different whitespace
+            for name in ('interactive', 'interactive_short'):
+                if name in positions:
+                    idx = positions[name][0] + len(DASHBOARD_MARKERS[name])
+                    edits.append((idx, idx, TAB_BUTTONS_B))
                     changes += 1
                     inserted = True
-                    print("    + Tab buttons (line-based, 2-line)")
+                    print("    + Tab buttons (Resources, Activity)")
                     break
             if not inserted:
-                print("    ! Could not find Interactive tab marker")
-
-    # 4. Extend conditional rendering
-    if "activeTab === 'resources'" not in content:
-        # Already handled above in tab buttons check
-        pass
-
-    if "<ResourcesPanel />" not in content:
-        if RENDER_OLD in content:
-            content = content.replace(RENDER_OLD, RENDER_NEW, 1)
-            changes += 1
-            print("    + Conditional rendering"
-                  " (Resources, Activity)")
-        else:
-            # Try with flexible whitespace
-            import re
-            pattern = (
-                r"\)\s*:\s*activeTab\s*===\s*'interactive'\s*\?\s*\(\s*"
-                r"<InteractiveView\s*/>\s*\)\s*:\s*\(")
-            match = re.search(pattern, content)
-            if match:
-                old = match.group(0)
-                new = old.replace(
-                    ") : (",
-                    ") : activeTab === 'resources' ? (\n"
-                    "                            "
-                    "<ResourcesPanel />\n"
-                    "                        "
-                    ") : activeTab === 'activity' ? (\n"
-                    "                            "
-                    "<ActivityPanel />\n"
-                    "                        ) : (")
-                content = content.replace(old, new, 1)
+                # Try line-based approach
+                for m in compiled(rb'Interactive').finditer(content):
+                    i = line_of(m.start())
+                    if b'</div>' in line(i):
+                        insert_line(i + 1, TAB_BUTTONS_B)
+                        changes += 1
+                        inserted = True
+                        print("    + Tab buttons (line-based)")
+                        break
+                    if (i + 1 < len(line_starts)
+                            and b'</div>' in line(i + 1)):
+                        insert_line(i + 2, TAB_BUTTONS_B)
+                        changes += 1
+                        inserted = True
+                        print("    + Tab buttons (line-based, 2-line)")
+                        break
+                if not inserted:
+                    missed += 1
+                    print("    ! Could not find Interactive tab marker")
+
+        # 4. Extend conditional rendering
+        if 'rendered' not in positions:
+            if 'render_old' in positions:
+                idx = positions['render_old'][0]
+                edits.append((idx, idx + len(DASHBOARD_MARKERS['render_old']),
+                              RENDER_NEW_B))
                 changes += 1
-                print("    + Conditional rendering (regex)")
+                print("    + Conditional rendering"
+                      " (Resources, Activity)")
             else:
-                print("    ! Could not find rendering marker")
-
-    # 5. Insert React component definitions before App component
-    if 'ResourcesPanel' not in content or 'const ResourcesPanel' not in content:
-        # Find the App component by looking for activeTab useState
-        lines = content.split('\n')
-        insert_idx = None
-        for i, line in enumerate(lines):
-            if ('const [activeTab, setActiveTab]' in line
-                    or 'const [activeTab,' in line):
+                # Try with flexible whitespace
+                match = RENDER_RE.search(content)
+                if match:
+                    new = match.group(0).replace(
+                        b") : (",
+                        b") : activeTab === 'resources' ? (\n"
+                        b"                            "
+                        b"<ResourcesPanel />\n"
+                        b"                        "
+                        b") : activeTab === 'activity' ? (\n"
+                        b"                            "
+                        b"<ActivityPanel />\n"
+                        b"                        ) : (")
+                    edits.append((match.start(), match.end(), new))
+                    changes += 1
+                    print("    + Conditional rendering (regex)")
+                else:
+                    missed += 1
+                    print("    ! Could not find rendering marker")
+
+        # 5. Insert React component definitions before App component
+        if 'components' not in positions:
+            # Find the App component by looking for activeTab useState
+            insert_idx = None
+            if 'active_tab' in positions:
+                i = line_of(positions['active_tab'][0])
                 # Go backward to find App declaration
                 for j in range(i - 1, max(i - 10, 0), -1):
-                    if ('const App' in lines[j]
-                            or 'function App' in lines[j]):
+                    if (b'const App' in line(j)
+                            or b'function App' in line(j)):
                         insert_idx = j
                         break
                 if insert_idx is None:
                     # Insert 2 lines before activeTab
                     insert_idx = max(i - 2, 0)
-                break
-
-        if insert_idx is not None:
-            lines.insert(insert_idx, REACT_COMPONENTS)
-            content = '\n'.join(lines)
-            changes += 1
-            print("    + React components"
-                  " (ResourcesPanel, ActivityPanel)")
-        else:
-            print("    ! Could not find App component for"
-                  " React insertion")
-            print("      Manual: Insert ResourcesPanel and"
-                  " ActivityPanel before App")
+
+            if insert_idx is not None:
+                insert_line(insert_idx, REACT_COMPONENTS_B)
+                changes += 1
+                print("    + React components"
+                      " (ResourcesPanel, ActivityPanel)")
+            else:
+                missed += 1
+                print("    ! Could not find App component for"
+                      " React insertion")
+                print("      Manual: Insert ResourcesPanel and"
+                      " ActivityPanel before App")
+        patched = splice(content, edits)
 
     if changes > 0:
         backup = path.with_suffix('.py.bak')
-        shutil.copy(path, backup)
-        path.write_text(content)
+        preserve(path, backup)
+        spit(path, patched)
+        if not missed:
+            # A partial patch is re-checked on the next run
+            record_file(__file__, path)
         print(f"  + dashboard.py ({changes} edits)")
         return True
     else:
@@ -6,6 +6,8 @@ Patch 2: Add group_membership table to demo.py
 import sys
 from pathlib import Path
 
+from _fileio import spit
+
 
 def patch_scoring_oom(nomad_dir):
     """Add job state awareness to memory scoring."""
@@ -77,7 +79,7 @@ def patch_scoring_oom(nomad_dir):
     
     if old in content:
         content = content.replace(old, new, 1)
-        path.write_text(content)
+        spit(path, content.encode())
         print("  + scoring.py: added OOM detection")
         return True
     else:
@@ -150,7 +152,7 @@ def patch_scoring_timeout(nomad_dir):
     
     if old in content:
         content = content.replace(old, new, 1)
-        path.write_text(content)
+        spit(path, content.encode())
         print("  + scoring.py: added TIMEOUT detection")
         return True
     else:
@@ -202,7 +204,7 @@ def patch_demo_groups(nomad_dir):
     
     if old in content:
         content = content.replace(old, new, 1)
-        path.write_text(content)
+        spit(path, content.encode())
         print("  + demo.py: added group_membership table")
         return True
     else:
@@ -23,9 +23,10 @@ After patching:
 """
 
 import sys
-import shutil
 from pathlib import Path
 
+from _fileio import preserve, spit
+
 
 # =====================================================================
 # PATCH: node_state.py
@@ -39,8 +40,6 @@ def patch_node_state(nomad_dir):
         return False
 
     content = path.read_text()
-    backup = path.with_suffix('.py.bak')
-    shutil.copy(path, backup)
     changes = 0
 
     # 1. Add cluster_name to __init__
@@ -154,7 +153,8 @@ def patch_node_state(nomad_dir):
         print("    + VALUES: placeholder count")
 
     if changes > 0:
-        path.write_text(content)
+        preserve(path, path.with_suffix('.py.bak'))
+        spit(path, content.encode())
         print(f"  + node_state.py ({changes} edits)")
     else:
         print("  = node_state.py (already patched)")
@@ -211,8 +211,8 @@ def patch_cli(nomad_dir):
 
     if changes > 0:
         backup = path.with_suffix('.py.bak2')
-        shutil.copy(path, backup)
-        path.write_text(content)
+        preserve(path, backup)
+        spit(path, content.encode())
         print(f"  + cli.py ({changes} edits)")
     else:
         print("  = cli.py (already patched)")
@@ -231,8 +231,6 @@ def patch_server(nomad_dir):
         return False
 
     content = path.read_text()
-    backup = path.with_suffix('.py.bak2')
-    shutil.copy(path, backup)
     changes = 0
 
     # 1. Update the SQL query to include cluster column
@@ -342,7 +340,8 @@ def patch_server(nomad_dir):
         print("    + Node SELECT: added cluster column")
 
     if changes > 0:
-        path.write_text(content)
+        preserve(path, path.with_suffix('.py.bak2'))
+        spit(path, content.encode())
         print(f"  + server.py ({changes} edits)")
     else:
         print("  = server.py (already patched or needs manual edits)")
@@ -7,9 +7,10 @@ Fixes:
   3. server.py - cluster→partition grouping
 """
 import sys
-import shutil
 from pathlib import Path
 
+from _fileio import preserve, spit
+
 
 def patch_node_state_index(nomad_dir):
     """Add cluster index to node_state.py."""
@@ -37,7 +38,7 @@ def patch_node_state_index(nomad_dir):
     
     if old in content:
         content = content.replace(old, new, 1)
-        path.write_text(content)
+        spit(path, content.encode())
         print("  + node_state.py: added cluster index")
         return True
     else:
@@ -67,7 +68,7 @@ def patch_node_state_insert(nomad_dir):
     
     if old in content:
         content = content.replace(old, new, 1)
-        path.write_text(content)
+        spit(path, content.encode())
         print("  + node_state.py: added cluster to INSERT columns")
         return True
     else:
@@ -142,8 +143,8 @@ def patch_server_grouping(nomad_dir):
     if old in content:
         content = content.replace(old, new, 1)
         backup = path.with_suffix('.py.bak3')
-        shutil.copy(path, backup)
-        path.write_text(content)
+        preserve(path, backup)
+        spit(path, content.encode())
         print("  + server.py: cluster→partition grouping")
         return True
     else:
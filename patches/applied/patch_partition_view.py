@@ -9,8 +9,13 @@ CPU/Memory utilization bars - matching the nomad demo appearance.
 import sys
 from pathlib import Path
 
+from _fileio import slurp, splice, spit
+from _patterns import compiled
+
 def patch_cluster_view(path):
-    content = open(path).read()
+    content = slurp(path)
+    # (start, end, text) against the file as read; written in one splice
+    edits = []
     
     # Find the old node-grid section
     old_grid = '''                    <div className="node-grid">
@@ -32,157 +37,280 @@ def patch_cluster_view(path):
                         ))}
                     </div>'''
     
-    new_grid = '''                    {(() => {
-                        // Group nodes by partition
-                        const partitions = cluster.partitions || {};
-                        const partitionNames = Object.keys(partitions);
-                        
-                        // If no partition info, render flat grid
-                        if (partitionNames.length === 0) {
-                            return (
-                                <div className="node-grid">
-                                    {nodes.map(node => (
-                                        <div
-                                            key={node.name}
-                                            className={`node-card ${node.status === 'down' ? 'down' : ''} ${selectedNode === node.name ? 'selected' : ''}`}
-                                            onClick={() => onSelectNode(node.name)}
-                                        >
-                                            <div className="node-name">{node.name}</div>
-                                            <div className={`node-indicator ${node.status === 'down' ? 'offline' : getHealthColor(node.success_rate || 0)}`}>
-                                                {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
-                                            </div>
-                                            <div className="node-jobs">
-                                                {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : `${node.jobs_today || 0} jobs`}
-                                            </div>
-                                            <div className="node-gpu-badge" style={{ background: node.has_gpu ? "#1a1a1a" : "rgba(255,255,255,0.9)", color: node.has_gpu ? "#ffffff" : "#1a1a1a" }}>{node.has_gpu ? "GPU" : "CPU"}</div>
-                                        </div>
-                                    ))}
-                                </div>
-                            );
+    new_grid = '''                    <PartitionSections
+                        partitions={cluster.partitions}
+                        nodes={nodes}
+                        selectedNode={selectedNode}
+                        onSelectNode={onSelectNode}
+                    />'''
+    
+    # Memoized node card, a node grid that only mounts the cards near the
+    # viewport once a partition is large, and the partition sections;
+    # defined ahead of ClusterView so they keep one component identity
+    # across renders
+    node_grid = '''        const GPU_BADGE_STYLE = { background: "#1a1a1a", color: "#ffffff" };
+        const CPU_BADGE_STYLE = { background: "rgba(255,255,255,0.9)", color: "#1a1a1a" };
+        
+        // Same bands as ClusterView's getHealthColor
+        const nodeHealthColor = (rate) => {
+            if (rate >= 0.85) return 'green';
+            if (rate >= 0.60) return 'yellow';
+            return 'red';
+        };
+        
+        // A card re-renders only when its node or its selection changes, so
+        // clicking a node touches two cards rather than the whole grid
+        const NodeCard = React.memo(function NodeCard({ node, isSelected, onSelectNode }) {
+            return (
+                <div
+                    className={`node-card ${node.status === 'down' ? 'down' : ''} ${isSelected ? 'selected' : ''}`}
+                    onClick={() => onSelectNode(node.name)}
+                >
+                    <div className="node-name">{node.name}</div>
+                    <div className={`node-indicator ${node.status === 'down' ? 'offline' : nodeHealthColor(node.success_rate || 0)}`}>
+                        {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
+                    </div>
+                    <div className="node-jobs">
+                        {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : `${node.jobs_today || 0} jobs`}
+                    </div>
+                    <div className="node-gpu-badge" style={node.has_gpu ? GPU_BADGE_STYLE : CPU_BADGE_STYLE}>{node.has_gpu ? "GPU" : "CPU"}</div>
+                </div>
+            );
+        }, (a, b) => a.node === b.node && a.isSelected === b.isSelected);
+        
+        // Partitions with more nodes than this render only the rows in view
+        const NODE_GRID_WINDOW_MIN = 200;
+        // Must match .node-grid (minmax(100px, 1fr), 12px gap) and the
+        // 144px grid-auto-rows of .node-grid.windowed
+        const NODE_CARD_MIN_WIDTH = 100;
+        const NODE_GRID_GAP = 12;
+        const NODE_ROW_HEIGHT = 144 + NODE_GRID_GAP;
+        
+        function NodeGrid({ nodes, renderCard }) {
+            const ref = useRef(null);
+            const [view, setView] = useState(null);
+            const windowed = nodes.length > NODE_GRID_WINDOW_MIN;
+            
+            React.useLayoutEffect(() => {
+                if (!windowed) return;
+                let frame = 0;
+                const measure = () => {
+                    frame = 0;
+                    const rect = ref.current.getBoundingClientRect();
+                    const cols = Math.max(1, Math.floor((rect.width + NODE_GRID_GAP) / (NODE_CARD_MIN_WIDTH + NODE_GRID_GAP)));
+                    // Rows in view plus one viewport of overscan on each side
+                    const span = Math.ceil(window.innerHeight / NODE_ROW_HEIGHT);
+                    const first = Math.max(0, Math.floor(-rect.top / NODE_ROW_HEIGHT) - span);
+                    const last = Math.max(first, Math.ceil((window.innerHeight - rect.top) / NODE_ROW_HEIGHT) + span);
+                    setView(v => v && v.cols === cols && v.first === first && v.last === last ? v : { cols, first, last });
+                };
+                const schedule = () => { if (!frame) frame = requestAnimationFrame(measure); };
+                measure();
+                // Capture, so scrolling inside any container is seen too
+                window.addEventListener('scroll', schedule, true);
+                window.addEventListener('resize', schedule);
+                return () => {
+                    cancelAnimationFrame(frame);
+                    window.removeEventListener('scroll', schedule, true);
+                    window.removeEventListener('resize', schedule);
+                };
+            }, [windowed]);
+            
+            if (!windowed) {
+                return <div className="node-grid">{nodes.map(renderCard)}</div>;
+            }
+            const { cols, first, last } = view || { cols: 1, first: 0, last: 0 };
+            const rows = Math.ceil(nodes.length / cols);
+            return (
+                <div
+                    ref={ref}
+                    className="node-grid windowed"
+                    style={{ paddingTop: first * NODE_ROW_HEIGHT, height: rows * NODE_ROW_HEIGHT - NODE_GRID_GAP }}
+                >
+                    {nodes.slice(first * cols, last * cols).map(renderCard)}
+                </div>
+            );
+        }
+        
+        // Every partition's nodes and totals, gathered in one pass over the
+        // nodes; a node can belong to more than one partition
+        function summarizePartitions(nodes, partitions) {
+            const sums = Object.keys(partitions).map(name => ({
+                name, nodes: [], online: 0, cpu: 0, mem: 0, gpu: 0, gpuOnline: 0,
+                hasGpu: false, jobs: 0, ok: 0,
+            }));
+            const byNode = new Map();
+            for (const s of sums) {
+                for (const nm of partitions[s.name] || []) {
+                    const into = byNode.get(nm);
+                    if (!into) byNode.set(nm, [s]);
+                    else if (into[into.length - 1] !== s) into.push(s);
+                }
+            }
+            for (const n of nodes) {
+                const into = byNode.get(n.name);
+                if (!into) continue;
+                const up = n.status === 'online';
+                for (const s of into) {
+                    s.nodes.push(n);
+                    if (n.has_gpu) s.hasGpu = true;
+                    if (up) {
+                        s.online++;
+                        s.cpu += n.cpu_percent || 0;
+                        s.mem += n.memory_percent || 0;
+                        if (n.has_gpu) {
+                            s.gpu += n.gpu_percent || 0;
+                            s.gpuOnline++;
                         }
-                        
-                        // Render partition sections
-                        return partitionNames.map(partName => {
-                            const partNodeNames = partitions[partName] || [];
-                            const partNodes = nodes.filter(n => partNodeNames.includes(n.name));
-                            if (partNodes.length === 0) return null;
-                            
-                            const online = partNodes.filter(n => n.status === 'online');
-                            const down = partNodes.length - online.length;
-                            const hasGpu = partNodes.some(n => n.has_gpu);
-                            
-                            // Calculate utilization
-                            const avgCpu = online.length > 0 
-                                ? Math.round(online.reduce((s, n) => s + (n.cpu_percent || 0), 0) / online.length)
-                                : 0;
-                            const avgMem = online.length > 0
-                                ? Math.round(online.reduce((s, n) => s + (n.memory_percent || 0), 0) / online.length)
-                                : 0;
-                            const avgGpu = hasGpu && online.length > 0
-                                ? Math.round(online.filter(n => n.has_gpu).reduce((s, n) => s + (n.gpu_percent || 0), 0) / online.filter(n => n.has_gpu).length)
-                                : 0;
-                            
-                            // Job stats for this partition
-                            const totalJobs = partNodes.reduce((s, n) => s + (n.jobs_today || 0), 0);
-                            const okJobs = partNodes.reduce((s, n) => s + (n.jobs_success || 0), 0);
-                            const failJobs = totalJobs - okJobs;
-                            
-                            // Partition type description
-                            const partType = hasGpu ? 'GPU-accelerated partition' 
-                                : partName.toLowerCase().includes('highmem') ? 'High-memory partition'
-                                : partName.toLowerCase().includes('debug') ? 'Debug partition'
-                                : partName.toLowerCase().includes('short') ? 'Short jobs partition'
-                                : 'General CPU partition';
-                            
-                            return (
-                                <div key={partName} className="partition-section">
-                                    <div className="partition-header">
-                                        <div className="partition-title">
-                                            <span className="partition-name">{partName}</span>
-                                            <span className="partition-type">{partType}</span>
-                                            <span className="partition-count">
-                                                {online.length}/{partNodes.length} nodes
-                                                {down > 0 && <span className="partition-down"> ({down} down)</span>}
-                                            </span>
-                                        </div>
-                                        <div className="partition-stats">
-                                            <span className="partition-jobs">
-                                                {totalJobs} jobs  <span style={{color: '#22c55e'}}>{okJobs} ok</span>  <span style={{color: '#ef4444'}}>{failJobs} fail</span>
-                                            </span>
-                                        </div>
-                                        <div className="partition-bars">
-                                            <div className="util-bar">
-                                                <span className="util-label">CPU</span>
-                                                <div className="util-track">
-                                                    <div className="util-fill cpu" style={{width: avgCpu + '%'}}></div>
-                                                </div>
-                                                <span className="util-value">{avgCpu}%</span>
-                                            </div>
-                                            <div className="util-bar">
-                                                <span className="util-label">Memory</span>
-                                                <div className="util-track">
-                                                    <div className="util-fill mem" style={{width: avgMem + '%'}}></div>
-                                                </div>
-                                                <span className="util-value">{avgMem}%</span>
-                                            </div>
-                                            {hasGpu && (
-                                                <div className="util-bar">
-                                                    <span className="util-label">GPU</span>
-                                                    <div className="util-track">
-                                                        <div className="util-fill gpu" style={{width: avgGpu + '%'}}></div>
-                                                    </div>
-                                                    <span className="util-value">{avgGpu}%</span>
-                                                </div>
-                                            )}
-                                        </div>
-                                    </div>
-                                    <div className="node-grid">
-                                        {partNodes.map(node => (
-                                            <div
-                                                key={node.name}
-                                                className={`node-card ${node.status === 'down' ? 'down' : ''} ${selectedNode === node.name ? 'selected' : ''}`}
-                                                onClick={() => onSelectNode(node.name)}
-                                            >
-                                                <div className="node-name">{node.name}</div>
-                                                <div className={`node-indicator ${node.status === 'down' ? 'offline' : getHealthColor(node.success_rate || 0)}`}>
-                                                    {node.status === 'down' ? '—' : `${Math.round((node.success_rate || 0) * 100)}%`}
-                                                </div>
-                                                <div className="node-jobs">
-                                                    {node.status === 'down' ? (node.slurm_state || 'OFFLINE') : `${node.jobs_today || 0} jobs`}
-                                                </div>
-                                                <div className="node-gpu-badge" style={{ background: node.has_gpu ? "#1a1a1a" : "rgba(255,255,255,0.9)", color: node.has_gpu ? "#ffffff" : "#1a1a1a" }}>{node.has_gpu ? "GPU" : "CPU"}</div>
-                                            </div>
-                                        ))}
-                                    </div>
-                                </div>
-                            );
-                        });
-                    })()}'''
+                    }
+                    s.jobs += n.jobs_today || 0;
+                    s.ok += n.jobs_success || 0;
+                }
+            }
+            return sums.filter(s => s.nodes.length > 0).map(s => ({
+                partName: s.name,
+                partNodes: s.nodes,
+                online: s.online,
+                down: s.nodes.length - s.online,
+                hasGpu: s.hasGpu,
+                avgCpu: s.online > 0 ? Math.round(s.cpu / s.online) : 0,
+                avgMem: s.online > 0 ? Math.round(s.mem / s.online) : 0,
+                avgGpu: s.gpuOnline > 0 ? Math.round(s.gpu / s.gpuOnline) : 0,
+                totalJobs: s.jobs,
+                okJobs: s.ok,
+                failJobs: s.jobs - s.ok,
+            }));
+        }
+        
+        // Bar widths move in 2% steps, so a poll that nudges an average by a
+        // point or so leaves the width, and its CSS transition, alone
+        const utilBucket = (pct) => Math.round(pct / 2) * 2;
+        
+        // Memoized: re-renders only when a rounded average changes
+        const PartitionBars = React.memo(function PartitionBars({ cpu, mem, gpu, hasGpu }) {
+            return (
+                <div className="partition-bars">
+                    <div className="util-bar">
+                        <span className="util-label">CPU</span>
+                        <div className="util-track">
+                            <div className="util-fill cpu" style={{width: utilBucket(cpu) + '%'}}></div>
+                        </div>
+                        <span className="util-value">{cpu}%</span>
+                    </div>
+                    <div className="util-bar">
+                        <span className="util-label">Memory</span>
+                        <div className="util-track">
+                            <div className="util-fill mem" style={{width: utilBucket(mem) + '%'}}></div>
+                        </div>
+                        <span className="util-value">{mem}%</span>
+                    </div>
+                    {hasGpu && (
+                        <div className="util-bar">
+                            <span className="util-label">GPU</span>
+                            <div className="util-track">
+                                <div className="util-fill gpu" style={{width: utilBucket(gpu) + '%'}}></div>
+                            </div>
+                            <span className="util-value">{gpu}%</span>
+                        </div>
+                    )}
+                </div>
+            );
+        });
+        
+        // Partition descriptions by name, worked out once per name rather
+        // than on every render
+        const PART_TYPE_CACHE = new Map();
+        const classifyPartition = (name, hasGpu) => {
+            if (hasGpu) return 'GPU-accelerated partition';
+            let type = PART_TYPE_CACHE.get(name);
+            if (type === undefined) {
+                const lc = name.toLowerCase();
+                type = lc.includes('highmem') ? 'High-memory partition'
+                    : lc.includes('debug') ? 'Debug partition'
+                    : lc.includes('short') ? 'Short jobs partition'
+                    : 'General CPU partition';
+                PART_TYPE_CACHE.set(name, type);
+            }
+            return type;
+        };
+        
+        function PartitionSections({ partitions, nodes, selectedNode, onSelectNode }) {
+            const summaries = useMemo(
+                () => summarizePartitions(nodes, partitions || {}),
+                [nodes, partitions]
+            );
+            // Shared by the flat grid and every partition's grid
+            const renderNodeCard = node => (
+                <NodeCard key={node.name} node={node} isSelected={selectedNode === node.name} onSelectNode={onSelectNode} />
+            );
+            
+            // If no partition info, render flat grid
+            if (!partitions || Object.keys(partitions).length === 0) {
+                return <NodeGrid nodes={nodes} renderCard={renderNodeCard} />;
+            }
+            
+            // Render partition sections
+            return summaries.map(({ partName, partNodes, online, down, hasGpu, avgCpu, avgMem, avgGpu, totalJobs, okJobs, failJobs }) => {
+                // Partition type description
+                const partType = classifyPartition(partName, hasGpu);
+                
+                return (
+                    <div key={partName} className="partition-section">
+                        <div className="partition-header">
+                            <div className="partition-title">
+                                <span className="partition-name">{partName}</span>
+                                <span className="partition-type">{partType}</span>
+                                <span className="partition-count">
+                                    {online}/{partNodes.length} nodes
+                                    {down > 0 && <span className="partition-down"> ({down} down)</span>}
+                                </span>
+                            </div>
+                            <div className="partition-stats">
+                                <span className="partition-jobs">
+                                    {totalJobs} jobs  <span style={{color: '#22c55e'}}>{okJobs} ok</span>  <span style={{color: '#ef4444'}}>{failJobs} fail</span>
+                                </span>
+                            </div>
+                            <PartitionBars cpu={avgCpu} mem={avgMem} gpu={avgGpu} hasGpu={hasGpu} />
+                        </div>
+                        <NodeGrid nodes={partNodes} renderCard={renderNodeCard} />
+                    </div>
+                );
+            });
+        }
+        
+'''
     
-    if old_grid in content:
-        content = content.replace(old_grid, new_grid, 1)
+    old_grid = old_grid.encode()
+    idx = content.find(old_grid)
+    if idx >= 0:
+        edits.append((idx, idx + len(old_grid), new_grid.encode()))
         print("  + Replaced node-grid with partition sections")
     else:
         print("  ! Could not find node-grid block")
         return False
     
+    idx = content.find(b'        function ClusterView(')
+    if content.find(b'function NodeGrid(') >= 0:
+        print("  = Node grid components already exist")
+    elif idx >= 0:
+        edits.append((idx, idx, node_grid.encode()))
+        print("  + Added NodeCard, NodeGrid and PartitionSections")
+    else:
+        print("  ! Could not find ClusterView")
+        return False
+    
     # Add CSS for partition sections
     # Find the existing .node-grid CSS and add partition styles after it
-    css_marker = '.node-grid {'
-    if css_marker in content:
-        # Find a good place to insert - after node-grid styles
-        idx = content.index(css_marker)
-        # Find the closing brace of .node-grid
+    idx = content.find(b'.node-grid {')
+    if idx >= 0:
+        # Find the closing brace of .node-grid, visiting only the braces
         brace_count = 0
         end_idx = idx
-        for i in range(idx, len(content)):
-            if content[i] == '{':
-                brace_count += 1
-            elif content[i] == '}':
-                brace_count -= 1
-                if brace_count == 0:
-                    end_idx = i + 1
-                    break
+        for m in compiled(rb'[{}]').finditer(content, idx):
+            brace_count += 1 if m.group() == b'{' else -1
+            if brace_count == 0:
+                end_idx = m.end()
+                break
         
         partition_css = '''
                     .partition-section {
@@ -265,17 +393,24 @@ def patch_cluster_view(path):
                         width: 36px;
                         text-align: right;
                     }
+                    .node-grid.windowed {
+                        grid-auto-rows: 144px;
+                        align-content: start;
+                    }
+                    .node-grid.windowed .node-card {
+                        overflow: hidden;
+                    }
 '''
         # Check if we already have partition-section CSS
-        if '.partition-section' not in content:
-            content = content[:end_idx] + partition_css + content[end_idx:]
+        if content.find(b'.partition-section') < 0:
+            edits.append((end_idx, end_idx, partition_css.encode()))
             print("  + Added partition CSS styles")
         else:
             print("  = Partition CSS already exists")
     else:
         print("  ! Could not find .node-grid CSS")
     
-    open(path, 'w').write(content)
+    spit(path, splice(content, edits))
     return True
 
 
@@ -24,9 +24,12 @@ Cumulative features:
 """
 
 import sys
-import shutil
 from pathlib import Path
 
+from _fileio import preserve, slurp, spit
+from _fingerprint import already_patched, record
+from _patterns import compiled
+
 NEW_INIT = r'''
 @cli.command()
 @click.option('--system', is_flag=True, help='Install system-wide for HPC')
@@ -1466,8 +1469,11 @@ def patch(cli_path: str):
         print(f"ERROR: {cli_path} not found")
         sys.exit(1)
 
-    content = path.read_text()
-    lines = content.split('\n')
+    raw = slurp(path)
+    if already_patched(__file__, raw):
+        print("Already patched")
+        return
+    lines = raw.decode().split('\n')
 
     # Find init function boundaries
     init_decorator_line = None
@@ -1510,19 +1516,19 @@ def patch(cli_path: str):
 
     # Create backup
     backup = path.with_suffix('.py.bak')
-    shutil.copy(path, backup)
+    preserve(path, backup)
     print(f"Backup saved: {backup}")
 
-    # Build new content
-    before = '\n'.join(lines[:init_decorator_line])
-    after = '\n'.join(lines[init_end_line:])
-    new_content = (before + '\n'
-                   + NEW_INIT.strip() + '\n\n\n' + after)
-
-    path.write_text(new_content)
+    # Build new content by splicing raw at the two line starts
+    line_starts = [0, *(m.end() for m in compiled(rb'\n').finditer(raw))]
+    new_raw = b''.join((raw[:line_starts[init_decorator_line]],
+                        NEW_INIT.strip().encode(), b'\n\n\n',
+                        raw[line_starts[init_end_line]:]))
+    spit(path, new_raw)
+    record(__file__, new_raw)
 
-    new_count = new_content.count('\n')
-    old_count = content.count('\n')
+    new_count = new_raw.count(b'\n')
+    old_count = raw.count(b'\n')
     print(f"Patched: {old_count} → {new_count} lines")
     print()
     print("Done! Test with:")
@@ -642,6 +642,29 @@ class TestGroupCollector:
         # 2G = 2 GB
         assert GroupCollector._parse_memory("2G") == pytest.approx(2.0, rel=0.01)
 
+    @pytest.mark.skipif(sqlite3.sqlite_version_info < (3, 31, 0),
+                        reason="generated columns need SQLite 3.31+")
+    def test_store_adds_submit_ts(self, tmp_path):
+        """Stored jobs get an epoch submit_ts for the dashboard window."""
+        from nomad.collectors.groups import GroupCollector
+        db = tmp_path / "groups.db"
+        collector = GroupCollector({}, str(db))
+        job = {
+            'job_id': '1', 'cluster': 'c1', 'username': 'user1',
+            'account': 'research', 'partition': 'compute',
+            'state': 'COMPLETED', 'elapsed_sec': 60, 'alloc_cpus': 1,
+            'mem_gb': 1.0, 'gpu_count': 0, 'cpu_hours': 0.02,
+            'gpu_hours': 0, 'submit_time': '2026-01-02T03:04:05',
+        }
+        collector.store([{'groups': [], 'accounting': [job]}])
+        collector.store([{'groups': [], 'accounting': [job]}])
+        conn = sqlite3.connect(db)
+        ts = conn.execute("SELECT submit_ts FROM job_accounting").fetchone()[0]
+        conn.close()
+        # SQLite reads the naive timestamp as UTC
+        assert ts == (datetime(2026, 1, 2, 3, 4, 5)
+                      - datetime(1970, 1, 1)).total_seconds()
+
 
 # =============================================================================
 # WORKSTATION COLLECTOR
@@ -13,6 +13,13 @@ from nomad.edu.explain import explain_job, load_job, load_summary
 from nomad.edu.progress import user_trajectory, group_summary
 
 
+@pytest.fixture(scope="module")
+def mock_cluster():
+    """One MockCluster shared by the read-only tests in this module."""
+    with MockCluster() as cluster:
+        yield cluster
+
+
 class TestProficiencyScoring:
     """Test the proficiency scoring engine."""
 
@@ -125,79 +132,73 @@ class TestProficiencyScoring:
 class TestMockCluster:
     """Test the MockCluster itself."""
 
-    def test_cluster_creates_database(self):
+    def test_cluster_creates_database(self, mock_cluster):
         """Test that MockCluster creates a valid database."""
-        with MockCluster() as cluster:
-            assert cluster.db_path is not None
-            
-            # Should be able to load jobs
-            import sqlite3
-            conn = sqlite3.connect(cluster.db_path)
-            count = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
-            conn.close()
-            
-            assert count > 0
-
-    def test_cluster_has_groups(self):
+        assert mock_cluster.db_path is not None
+        
+        # Should be able to load jobs
+        import sqlite3
+        conn = sqlite3.connect(mock_cluster.db_path)
+        count = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        conn.close()
+        
+        assert count > 0
+
+    def test_cluster_has_groups(self, mock_cluster):
         """Test that MockCluster creates group memberships."""
-        with MockCluster() as cluster:
-            import sqlite3
-            conn = sqlite3.connect(cluster.db_path)
-            groups = conn.execute("SELECT DISTINCT group_name FROM group_membership").fetchall()
-            conn.close()
-            
-            group_names = [g[0] for g in groups]
-            assert "cs101" in group_names
-            assert "bio301" in group_names
+        import sqlite3
+        conn = sqlite3.connect(mock_cluster.db_path)
+        groups = conn.execute("SELECT DISTINCT group_name FROM group_membership").fetchall()
+        conn.close()
+        
+        group_names = [g[0] for g in groups]
+        assert "cs101" in group_names
+        assert "bio301" in group_names
 
 
 class TestExplainWithMockCluster:
     """Test explain functionality with MockCluster."""
 
-    def test_explain_job_from_mock(self):
+    def test_explain_job_from_mock(self, mock_cluster):
         """Test explaining a job from mock database."""
-        with MockCluster() as cluster:
-            # Get a job ID from the mock
-            import sqlite3
-            conn = sqlite3.connect(cluster.db_path)
-            job_id = conn.execute("SELECT job_id FROM jobs LIMIT 1").fetchone()[0]
-            conn.close()
+        # Get a job ID from the mock
+        import sqlite3
+        conn = sqlite3.connect(mock_cluster.db_path)
+        job_id = conn.execute("SELECT job_id FROM jobs LIMIT 1").fetchone()[0]
+        conn.close()
 
-            result = explain_job(job_id, cluster.db_path, show_progress=False)
+        result = explain_job(job_id, mock_cluster.db_path, show_progress=False)
 
-            assert result is not None
-            assert "Proficiency Scores" in result
-            assert "CPU Efficiency" in result
+        assert result is not None
+        assert "Proficiency Scores" in result
+        assert "CPU Efficiency" in result
 
-    def test_explain_nonexistent_job(self):
+    def test_explain_nonexistent_job(self, mock_cluster):
         """Test explaining a job that doesn't exist."""
-        with MockCluster() as cluster:
-            result = explain_job("99999999", cluster.db_path)
-            assert result is None
+        result = explain_job("99999999", mock_cluster.db_path)
+        assert result is None
 
 
 class TestProgressWithMockCluster:
     """Test progress tracking with MockCluster."""
 
-    def test_user_trajectory(self):
+    def test_user_trajectory(self, mock_cluster):
         """Test user trajectory calculation."""
-        with MockCluster() as cluster:
-            # Alice should have jobs in the mock
-            traj = user_trajectory(cluster.db_path, "alice", days=90)
+        # Alice should have jobs in the mock
+        traj = user_trajectory(mock_cluster.db_path, "alice", days=90)
 
-            # May be None if not enough jobs, but shouldn't crash
-            if traj is not None:
-                assert traj.username == "alice"
-                assert traj.total_jobs > 0
+        # May be None if not enough jobs, but shouldn't crash
+        if traj is not None:
+            assert traj.username == "alice"
+            assert traj.total_jobs > 0
 
-    def test_group_summary(self):
+    def test_group_summary(self, mock_cluster):
         """Test group summary calculation."""
-        with MockCluster() as cluster:
-            gs = group_summary(cluster.db_path, "cs101", days=90)
+        gs = group_summary(mock_cluster.db_path, "cs101", days=90)
 
-            if gs is not None:
-                assert gs.group_name == "cs101"
-                assert gs.member_count > 0
+        if gs is not None:
+            assert gs.group_name == "cs101"
+            assert gs.member_count > 0
 
 
 class TestPatcherFramework: